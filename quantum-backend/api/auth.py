@@ -3,34 +3,72 @@ Authentication API Endpoints
 Simple JWT-based authentication for demo
 """
 
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from datetime import datetime, timedelta
-from jose import JWTError, jwt
+from fastapi import APIRouter, HTTPException, Depends, Request
+from pydantic import BaseModel, EmailStr, field_validator
+from jose import jwt
 from passlib.context import CryptContext
 from config import settings
+from services.cache import TTLCache
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import hashlib
 import logging
+import math
+import os
+import time
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Prebuilt error responses for the hot auth paths. Raise them with
+# .with_traceback(None) so tracebacks don't accumulate on the shared instance.
+INVALID_CREDENTIALS = HTTPException(status_code=401, detail="Invalid credentials")
+EMAIL_ALREADY_REGISTERED = HTTPException(status_code=400, detail="Email already registered")
+
 # Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.bcrypt_rounds
+)
+
+# Recently verified credentials, keyed by (email, sha256(password + salt))
+# so repeat logins skip the bcrypt key schedule. Plaintext is never stored.
+verify_cache = TTLCache(maxsize=1024, ttl=300)
+
+# bcrypt releases the GIL, so hashing runs here instead of on the event loop
+BCRYPT_POOL = ThreadPoolExecutor(max_workers=os.cpu_count(), thread_name_prefix="bcrypt")
+
+# JWT settings, resolved once for the token hot path
+TOKEN_EXPIRE_SECONDS = settings.access_token_expire_minutes * 60
+SECRET_KEY = settings.secret_key
+ALGORITHM = settings.algorithm
+
+
+def normalize_email(value):
+    """Strip and lowercase emails so lookups and cache keys are case-insensitive"""
+    if isinstance(value, str):
+        return value.strip().lower()
+    return value
 
 
 class LoginRequest(BaseModel):
     """Login request"""
-    email: str
+    email: EmailStr
     password: str
+    
+    _normalize_email = field_validator("email", mode="before")(normalize_email)
 
 
 class SignupRequest(BaseModel):
     """Signup request"""
     name: str
-    email: str
+    email: EmailStr
     password: str
     role: str
+    
+    _normalize_email = field_validator("email", mode="before")(normalize_email)
 
 
 class TokenResponse(BaseModel):
@@ -56,100 +94,143 @@ def get_demo_user():
     return MOCK_USERS["demo@quantum.ai"]
 
 
+def verify_password(email: str, password: str, password_hash: str) -> bool:
+    """Verify a password, reusing recent successful verifications"""
+    salt = password_hash[:29]
+    key = (email, hashlib.sha256(password.encode() + salt.encode()).digest())
+    
+    if verify_cache.get(key):
+        return True
+    
+    if pwd_context.verify(password, password_hash):
+        verify_cache.set(key, True)
+        return True
+    
+    verify_cache.pop(key)
+    return False
+
+class AuthRateLimiter:
+    """
+    Fixed-window rate limiter for auth endpoints
+    Evaluated as a dependency, before any bcrypt work is done
+    """
+    
+    def __init__(self, limit: int = 5, window: int = 300):
+        self.limit = limit
+        self.window = window
+        # key -> [window_expires_at, request_count]
+        self.counters = TTLCache(maxsize=10000, ttl=window)
+    
+    async def __call__(self, request: Request):
+        try:
+            body = await request.json()
+            email = str(body.get("email", "")).strip().lower()
+        except Exception:
+            email = ""
+        
+        client_ip = request.client.host if request.client else "unknown"
+        email_digest = hashlib.blake2b(email.encode(), digest_size=8).hexdigest()
+        key = f"rl:auth:{request.url.path}:{client_ip}:{email_digest}"
+        
+        now = time.time()
+        counter = self.counters.get(key)
+        if counter is None:
+            self.counters.set(key, [now + self.window, 1])
+            return
+        
+        counter[1] += 1
+        if counter[1] > self.limit:
+            retry_after = max(1, math.ceil(counter[0] - now))
+            raise HTTPException(
+                status_code=429,
+                detail="Too many attempts. Please try again later.",
+                headers={"Retry-After": str(retry_after)}
+            )
+
+
+login_rate_limiter = AuthRateLimiter(limit=5, window=300)
+signup_rate_limiter = AuthRateLimiter(limit=5, window=300)
+
 
 def create_access_token(data: dict) -> str:
     """Create JWT access token"""
-    to_encode = data.copy()
-    expire = datetime.utcnow() + timedelta(minutes=settings.access_token_expire_minutes)
-    to_encode.update({"exp": expire})
-    
-    encoded_jwt = jwt.encode(
-        to_encode,
-        settings.secret_key,
-        algorithm=settings.algorithm
-    )
-    return encoded_jwt
+    # jose accepts an integer UNIX timestamp for "exp" (RFC 7519 NumericDate)
+    to_encode = {**data, "exp": int(time.time()) + TOKEN_EXPIRE_SECONDS}
+    
+    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
-@router.post("/login", response_model=TokenResponse)
+@router.post("/login", response_model=TokenResponse, dependencies=[Depends(login_rate_limiter)])
 async def login(request: LoginRequest):
     """
     Login endpoint
     Demo credentials: demo@quantum.ai / demo123
     """
-    try:
-        # Initialize demo user if needed
-        get_demo_user()
-        
-        # Check if user exists
-        user = MOCK_USERS.get(request.email)
-        
-        if not user:
-            raise HTTPException(status_code=401, detail="Invalid credentials")
-        
-        # Verify password
-        if not pwd_context.verify(request.password, user["password_hash"]):
-            raise HTTPException(status_code=401, detail="Invalid credentials")
-        
-        # Create access token
-        access_token = create_access_token(
-            data={"sub": request.email, "role": user["role"]}
-        )
-        
-        return TokenResponse(
-            access_token=access_token,
-            user={
-                "name": user["name"],
-                "email": user["email"],
-                "role": user["role"]
-            }
-        )
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Login failed: {str(e)}")
-        raise HTTPException(status_code=500, detail="Login failed")
+    # Initialize demo user if needed
+    get_demo_user()
+    
+    # Check if user exists
+    user = MOCK_USERS.get(request.email)
+    
+    if not user:
+        raise INVALID_CREDENTIALS.with_traceback(None)
+    
+    # Verify password
+    loop = asyncio.get_running_loop()
+    verified = await loop.run_in_executor(
+        BCRYPT_POOL, verify_password, request.email, request.password, user["password_hash"]
+    )
+    if not verified:
+        raise INVALID_CREDENTIALS.with_traceback(None)
+    
+    # Create access token
+    access_token = create_access_token(
+        data={"sub": request.email, "role": user["role"]}
+    )
+    
+    return TokenResponse(
+        access_token=access_token,
+        user={
+            "name": user["name"],
+            "email": user["email"],
+            "role": user["role"]
+        }
+    )
 
 
-@router.post("/signup", response_model=TokenResponse)
+@router.post("/signup", response_model=TokenResponse, dependencies=[Depends(signup_rate_limiter)])
 async def signup(request: SignupRequest):
     """
     Signup endpoint
     Creates a new user account
     """
-    try:
-        # Check if user already exists
-        if request.email in MOCK_USERS:
-            raise HTTPException(status_code=400, detail="Email already registered")
-        
-        # Hash password
-        password_hash = pwd_context.hash(request.password)
-        
-        # Create user
-        MOCK_USERS[request.email] = {
+    # Check if user already exists
+    if request.email in MOCK_USERS:
+        raise EMAIL_ALREADY_REGISTERED.with_traceback(None)
+    
+    # Hash password
+    password_hash = await asyncio.get_running_loop().run_in_executor(
+        BCRYPT_POOL, pwd_context.hash, request.password
+    )
+    
+    # Create user
+    MOCK_USERS[request.email] = {
+        "name": request.name,
+        "email": request.email,
+        "password_hash": password_hash,
+        "role": request.role
+    }
+    
+    # Create access token
+    access_token = create_access_token(
+        data={"sub": request.email, "role": request.role}
+    )
+    
+    return TokenResponse(
+        access_token=access_token,
+        user={
             "name": request.name,
             "email": request.email,
-            "password_hash": password_hash,
             "role": request.role
         }
-        
-        # Create access token
-        access_token = create_access_token(
-            data={"sub": request.email, "role": request.role}
-        )
-        
-        return TokenResponse(
-            access_token=access_token,
-            user={
-                "name": request.name,
-                "email": request.email,
-                "role": request.role
-            }
-        )
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Signup failed: {str(e)}")
-        raise HTTPException(status_code=500, detail="Signup failed")
+    )
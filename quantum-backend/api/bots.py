@@ -3,19 +3,26 @@ Bot Management API Endpoints
 Handles Vexa AI bot operations
 """
 
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter
 from pydantic import BaseModel
-from typing import Optional, List
-from services.vexa_client import VexaClient, BotRequest
-from config import settings
+from typing import Optional
+from services.vexa_client import vexa_client, BotRequest
 import logging
+import re
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-# Initialize Vexa client
-vexa_client = VexaClient(api_key=settings.vexa_api_key, base_url=settings.vexa_base_url)
+# Meeting URL shapes, compiled once at import:
+#   https://meet.google.com/abc-defg-hij
+#   https://teams.live.com/meet/9366473044740?p=xxx
+# Matched from the start of the URL (scheme optional), so a meeting URL
+# buried in another site's path or query string is rejected
+MEETING_URL_PATTERNS = {
+    "google_meet": re.compile(r"(?:https?://)?meet\.google\.com/(?P<id>[a-z0-9-]+)", re.IGNORECASE),
+    "teams": re.compile(r"(?:https?://)?teams\.live\.com/meet/(?P<id>\d+)", re.IGNORECASE),
+}
 
 
 class StartBotRequest(BaseModel):
@@ -48,29 +55,52 @@ def extract_meeting_id(platform: str, meeting_url: str) -> tuple[str, Optional[s
     Returns:
         Tuple of (meeting_id, passcode)
     """
-    if platform == "google_meet":
-        # Extract from https://meet.google.com/abc-defg-hij
-        meeting_id = meeting_url.split("/")[-1].split("?")[0]
-        return meeting_id, None
-    
-    elif platform == "teams":
-        # Extract from https://teams.live.com/meet/9366473044740?p=xxx
-        parts = meeting_url.split("/")[-1].split("?")
-        meeting_id = parts[0]
-        passcode = None
-        
-        if len(parts) > 1:
-            # Extract passcode from query params
-            params = parts[1].split("&")
-            for param in params:
-                if param.startswith("p="):
-                    passcode = param.split("=")[1]
-                    break
+    pattern = MEETING_URL_PATTERNS.get(platform)
+    if pattern is None:
+        raise ValueError(f"Unsupported platform: {platform}")
+    
+    match = pattern.match(meeting_url)
+    if match is None:
+        raise ValueError(f"Invalid {platform} meeting URL: {meeting_url}")
+    
+    passcode = None
+    if platform == "teams":
+        passcode = extract_passcode(meeting_url, match.end())
+    
+    return match["id"], passcode
+
+
+def extract_passcode(meeting_url: str, start: int = 0) -> Optional[str]:
+    """
+    Find the value of the "p" query parameter without splitting the query
+    
+    Args:
+        meeting_url: Full meeting URL
+        start: Offset to start looking for the query string from
         
-        return meeting_id, passcode
+    Returns:
+        Passcode, or None if the URL has no non-empty "p" parameter
+    """
+    query_start = meeting_url.find("?", start)
+    if query_start == -1:
+        return None
     
-    else:
-        raise ValueError(f"Unsupported platform: {platform}")
+    query_end = meeting_url.find("#", query_start)
+    if query_end == -1:
+        query_end = len(meeting_url)
+    
+    # Only accept "p=" at the start of a parameter, not inside another value
+    i = meeting_url.find("p=", query_start + 1, query_end)
+    while i != -1 and meeting_url[i - 1] not in "?&":
+        i = meeting_url.find("p=", i + 1, query_end)
+    if i == -1:
+        return None
+    
+    value_end = meeting_url.find("&", i, query_end)
+    if value_end == -1:
+        value_end = query_end
+    
+    return meeting_url[i + 2:value_end] or None
 
 
 @router.post("/start")
@@ -83,35 +113,30 @@ async def start_bot(request: StartBotRequest):
     2. Requests Vexa bot to join the meeting
     3. Returns bot and meeting details
     """
-    try:
-        # Extract meeting ID and passcode
-        meeting_id, passcode = extract_meeting_id(request.platform, request.meeting_url)
-        
-        # Create bot request
-        bot_request = BotRequest(
-            platform=request.platform,
-            native_meeting_id=meeting_id,
-            passcode=passcode,
-            language=request.language,
-            bot_name=request.bot_name
-        )
-        
-        # Request bot from Vexa
-        result = vexa_client.request_bot(bot_request)
-        
-        logger.info(f"Bot started for meeting {meeting_id}")
-        
-        return {
-            "success": True,
-            "message": "Bot requested successfully. It will join the meeting in ~10 seconds.",
-            "meeting_id": meeting_id,
-            "platform": request.platform,
-            "data": result
-        }
-        
-    except Exception as e:
-        logger.error(f"Failed to start bot: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+    # Extract meeting ID and passcode
+    meeting_id, passcode = extract_meeting_id(request.platform, request.meeting_url)
+    
+    # Create bot request
+    bot_request = BotRequest(
+        platform=request.platform,
+        native_meeting_id=meeting_id,
+        passcode=passcode,
+        language=request.language,
+        bot_name=request.bot_name
+    )
+    
+    # Request bot from Vexa
+    result = await vexa_client.request_bot(bot_request)
+    
+    logger.info(f"Bot started for meeting {meeting_id}")
+    
+    return {
+        "success": True,
+        "message": "Bot requested successfully. It will join the meeting in ~10 seconds.",
+        "meeting_id": meeting_id,
+        "platform": request.platform,
+        "data": result
+    }
 
 
 @router.post("/stop")
@@ -120,20 +145,15 @@ async def stop_bot(request: StopBotRequest):
     Stop a bot and remove it from the meeting
     IMPORTANT: This frees up API credits
     """
-    try:
-        result = vexa_client.stop_bot(request.platform, request.native_meeting_id)
-        
-        logger.info(f"Bot stopped for meeting {request.native_meeting_id}")
-        
-        return {
-            "success": True,
-            "message": "Bot stopped successfully. API credits freed.",
-            "data": result
-        }
-        
-    except Exception as e:
-        logger.error(f"Failed to stop bot: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+    result = await vexa_client.stop_bot(request.platform, request.native_meeting_id)
+    
+    logger.info(f"Bot stopped for meeting {request.native_meeting_id}")
+    
+    return {
+        "success": True,
+        "message": "Bot stopped successfully. API credits freed.",
+        "data": result
+    }
 
 
 @router.get("/status")
@@ -141,18 +161,13 @@ async def get_bot_status():
     """
     Get status of all running bots
     """
-    try:
-        bots = vexa_client.get_bot_status()
-        
-        return {
-            "success": True,
-            "active_bots": len(bots) if isinstance(bots, list) else 0,
-            "bots": bots
-        }
-        
-    except Exception as e:
-        logger.error(f"Failed to get bot status: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+    bots = await vexa_client.get_bot_status()
+    
+    return {
+        "success": True,
+        "active_bots": len(bots) if isinstance(bots, list) else 0,
+        "bots": bots
+    }
 
 
 @router.put("/{platform}/{meeting_id}/language")
@@ -164,19 +179,14 @@ async def update_bot_language(
     """
     Update bot language during a meeting
     """
-    try:
-        result = vexa_client.update_bot_config(
-            platform=platform,
-            native_meeting_id=meeting_id,
-            language=request.language
-        )
-        
-        return {
-            "success": True,
-            "message": f"Bot language updated to {request.language}",
-            "data": result
-        }
-        
-    except Exception as e:
-        logger.error(f"Failed to update bot language: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+    result = await vexa_client.update_bot_config(
+        platform=platform,
+        native_meeting_id=meeting_id,
+        language=request.language
+    )
+    
+    return {
+        "success": True,
+        "message": f"Bot language updated to {request.language}",
+        "data": result
+    }
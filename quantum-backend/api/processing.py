@@ -3,40 +3,282 @@ Meeting Processing API Endpoints
 Handles AI processing and data retrieval
 """
 
-from fastapi import APIRouter, HTTPException, Depends, UploadFile, File
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Header, Query
 from pydantic import BaseModel
-from typing import Optional, List, Dict, Any
-from sqlalchemy.orm import Session
-from services.vexa_client import VexaClient
-from services.ai_service import AIService
-from database import get_db, Meeting, Transcript, Summary, ActionItem, Participant, Emotion, init_db
-from config import settings
+from typing import Optional, List, Dict, Any, Tuple
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from services.vexa_client import vexa_client
+from services.ai_service import ai_service
+from database import get_db, Meeting, Transcript, Summary, ActionItem, Participant, Emotion
+import asyncio
 import logging
-import json
+import numpy as np
 import os
 import tempfile
 from datetime import datetime
 import sys
-import threading
 import time
-from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 
 logger = logging.getLogger(__name__)
 
+# Emotion detection needs the optional Sales_emotion_module ML stack
+# (OpenCV, TensorFlow/PyTorch). Import it once at startup; the emotion
+# endpoints return 503 when it isn't installed.
+# The module's files do a top-level `from config import ...` meaning their
+# own config.py, but `config` is already the backend settings module, so
+# point that name at the module's config for the duration of the import.
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'Sales_emotion_module'))
+backend_config = sys.modules.get('config')
+try:
+    import cv2
+    import Sales_emotion_module.config as emotion_config
+    sys.modules['config'] = emotion_config
+    from meeting_emotion_analyzer import analyze_meeting_video, MeetingEmotionAnalyzer
+    MODEL_PATH, MODEL_TYPE_PROD = emotion_config.MODEL_PATH, emotion_config.MODEL_TYPE_PROD
+except ImportError as e:
+    logger.warning(f"Emotion analysis unavailable: {str(e)}")
+    cv2 = analyze_meeting_video = MeetingEmotionAnalyzer = None
+    MODEL_PATH = MODEL_TYPE_PROD = None
+finally:
+    if backend_config is not None:
+        sys.modules['config'] = backend_config
+    else:
+        sys.modules.pop('config', None)
+
 router = APIRouter()
 
-# Initialize Vexa client and AI service
-vexa_client = VexaClient(api_key=settings.vexa_api_key, base_url=settings.vexa_base_url)
-ai_service = AIService()
+# Prebuilt error responses. Raise them with .with_traceback(None) so
+# tracebacks don't accumulate on the shared instance.
+TRANSCRIPT_NOT_FOUND = HTTPException(status_code=404, detail="Transcript not found")
+EMPTY_TRANSCRIPT = HTTPException(status_code=400, detail="Empty transcript")
+SUMMARY_NOT_FOUND = HTTPException(status_code=404, detail="Summary not found. Process the meeting first.")
+NOT_A_VIDEO = HTTPException(status_code=400, detail="File must be a video")
+INVALID_FRAME = HTTPException(status_code=400, detail="Frame must be a JPEG or PNG image")
+EMOTION_ANALYSIS_UNAVAILABLE = HTTPException(
+    status_code=503,
+    detail="Emotion analysis is not available. Install the Sales_emotion_module dependencies."
+)
+FILE_TOO_LARGE = HTTPException(status_code=413, detail="File too large. Maximum size is 500MB.")
+EMOTION_ANALYSIS_NOT_STARTED = HTTPException(
+    status_code=400,
+    detail="Emotion analysis not started for this meeting. Call start-emotion-analysis first."
+)
+EMOTION_ANALYSIS_NOT_RUNNING = HTTPException(
+    status_code=400,
+    detail="Emotion analysis not running for this meeting"
+)
+
+# Video uploads are streamed to disk in chunks and capped at 500MB
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+MAX_VIDEO_SIZE = 500 * 1024 * 1024
+
+# Upper bound for the optional limit on list endpoints
+MAX_PAGE_SIZE = 1000
+
+# Real-time emotions are stored for every 10th frame only; those rows are
+# buffered per meeting and written when either flush limit is reached
+EMOTION_SAMPLE_EVERY = 10
+EMOTION_FLUSH_ROWS = 500
+EMOTION_FLUSH_INTERVAL = 5.0
 
-# Initialize database on startup
-init_db()
+# People seen in fewer frames than this are treated as false positives
+MIN_FRAMES_PER_PERSON = 30
+
+# Engagement weight per detected emotion; unknown labels count as 0.5
+ENGAGEMENT_SCORES = {
+    'happy': 0.9,
+    'neutral': 0.6,
+    'sad': 0.3,
+    'angry': 0.2,
+    'fear': 0.3,
+    'surprise': 0.7,
+    'disgust': 0.2
+}
+
+# Worker threads for CPU-bound frame analysis. A thread pool rather than a
+# process pool because analyzers hold unpicklable model state.
+FRAME_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="emotion-frame")
 
 # Store active emotion analyzers for real-time processing
 active_emotion_analyzers: Dict[str, Any] = {}
-emotion_analysis_lock = threading.Lock()
-init_db()
+# Guards adding/removing analyzers; each analyzer also has its own lock for
+# per-frame work. asyncio locks, since handlers await while holding them.
+emotion_analysis_lock = asyncio.Lock()
+
+
+async def insert_rows(db: AsyncSession, model, rows: List[Dict[str, Any]], **values):
+    """
+    Insert plain row dicts in one executemany, skipping ORM unit-of-work
+    
+    Column values shared by every row (e.g. meeting_id) can be passed as
+    keyword arguments instead of being copied into each row dict.
+    """
+    # An empty parameter list would run a single INSERT ... DEFAULT VALUES
+    if rows:
+        await db.execute(insert(model).values(**values) if values else insert(model), rows)
+
+
+async def flush_pending_emotions(db: AsyncSession, analyzer_data: Dict[str, Any]):
+    """Write a meeting's buffered real-time emotion rows in one batch"""
+    # Swap the buffer out first so frames arriving during the write start a new batch
+    rows = analyzer_data['pending_emotions']
+    analyzer_data['pending_emotions'] = []
+    analyzer_data['last_save_time'] = time.time()
+    
+    if rows:
+        await insert_rows(db, Emotion, rows)
+        await db.commit()
+
+
+def calculate_engagement_score(emotion_distribution: Dict[str, int]) -> float:
+    """Count-weighted mean engagement of an emotion distribution, on a 0-10 scale"""
+    counts = np.fromiter(emotion_distribution.values(), dtype=np.float64, count=len(emotion_distribution))
+    total_count = counts.sum()
+    if total_count <= 0:
+        return 5.0
+    
+    scores = np.fromiter(
+        (ENGAGEMENT_SCORES.get(emotion.lower(), 0.5) for emotion in emotion_distribution),
+        dtype=np.float64,
+        count=len(emotion_distribution)
+    )
+    return float(scores @ counts / total_count * 10)
+
+
+def filter_active_people(summary: Dict[str, Any]) -> None:
+    """
+    Drop likely false-positive people from an analyzer summary, in place
+    
+    A person is kept if they were seen for at least 5% of the meeting
+    (3 seconds minimum) and in at least 30 frames. Survivors are renumbered
+    Person 1, Person 2, ... in order.
+    """
+    meeting_duration = summary.get('meeting_duration', 0)
+    if meeting_duration <= 0:
+        return
+    
+    min_duration_seconds = max(meeting_duration * 0.05, 3.0)
+    people = summary.get('people', [])
+    
+    # Test every person at once on parallel duration/frame arrays
+    durations = np.fromiter((p.get('total_duration', 0) for p in people), dtype=np.float64, count=len(people))
+    frames = np.fromiter((p.get('total_frames', 0) for p in people), dtype=np.int64, count=len(people))
+    keep = ((durations >= min_duration_seconds) & (frames >= MIN_FRAMES_PER_PERSON)).tolist()
+    
+    filtered_people = [person_data for person_data, kept in zip(people, keep) if kept]
+    if logger.isEnabledFor(logging.DEBUG):
+        for person_data, kept in zip(people, keep):
+            if not kept:
+                logger.debug(f"Filtered out person {person_data.get('person_id')} - duration: {person_data.get('total_duration', 0):.1f}s (min: {min_duration_seconds:.1f}s), frames: {person_data.get('total_frames', 0)} (min: {MIN_FRAMES_PER_PERSON})")
+    
+    summary['people'] = filtered_people
+    summary['total_people_active'] = len(filtered_people)
+    
+    # Renumber people to be sequential (Person 1, Person 2, etc.)
+    for idx, person_data in enumerate(filtered_people, 1):
+        person_data['person_id'] = idx
+        person_data['person_name'] = f"Person {idx}"
+
+
+def format_timestamps(seconds: np.ndarray) -> List[str]:
+    """Format an array of non-negative offsets in seconds as MM:SS labels"""
+    minutes, secs = np.divmod(seconds.astype(np.int64), 60)
+    return [f"{m:02d}:{s:02d}" for m, s in zip(minutes.tolist(), secs.tolist())]
+
+
+def build_emotion_timeline(people: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Sample each speaking session's dominant emotion every 5 seconds"""
+    emotion_timeline = []
+    for person_data in people:
+        for session in person_data.get('speaking_sessions', []):
+            session_duration = session.get('duration', 0)
+            if session_duration <= 0:
+                continue
+            
+            session_start = session.get('start_time', 0)
+            dominant_emotion = session.get('dominant_emotion', 'neutral')
+            emotion = dominant_emotion.lower() if dominant_emotion else 'neutral'
+            avg_confidence = session.get('average_confidence', 0.5)
+            
+            # All sample offsets for the session at once
+            num_samples = max(1, int(session_duration / 5))
+            timestamps = session_start + np.arange(num_samples) * session_duration / num_samples
+            
+            emotion_timeline.extend(
+                {"timestamp": label, "emotion": emotion, "intensity": avg_confidence}
+                for label in format_timestamps(timestamps)
+            )
+    
+    return emotion_timeline
+
+
+def build_formatted_timeline(people: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Split each speaking session into 10-second display ranges, ordered by start time"""
+    formatted_timeline = []
+    segment_start_arrays = []
+    for person_data in people:
+        person_name = person_data.get('person_name') or f"Person {person_data.get('person_id')}"
+        for session in person_data.get('speaking_sessions', []):
+            session_start = session.get('start_time', 0)
+            session_end = session.get('end_time', session_start)
+            session_duration = session.get('duration', 0)
+            dominant_emotion = session.get('dominant_emotion', 'neutral')
+            
+            if session_duration > 0:
+                # Create 10-second segments, all bounds for the session at once
+                segment_duration = 10.0
+                num_segments = max(1, int(session_duration / segment_duration))
+                segment_starts = session_start + np.arange(num_segments) * segment_duration
+                segment_ends = np.minimum(segment_starts + segment_duration, session_end)
+                emotion = dominant_emotion.capitalize() if dominant_emotion else 'Neutral'
+                segment_start_arrays.append(segment_starts)
+                
+                formatted_timeline.extend(
+                    {
+                        "time_range": f"{start_label} to {end_label}",
+                        "person": person_name,
+                        "emotion": emotion,
+                        "start_time": segment_start,
+                        "end_time": segment_end
+                    }
+                    for start_label, end_label, segment_start, segment_end in zip(
+                        format_timestamps(segment_starts),
+                        format_timestamps(segment_ends),
+                        segment_starts.tolist(),
+                        segment_ends.tolist()
+                    )
+                )
+    
+    # Sort by start time, using the start arrays already built per session
+    if segment_start_arrays:
+        order = np.argsort(np.concatenate(segment_start_arrays), kind='stable')
+        formatted_timeline = [formatted_timeline[i] for i in order.tolist()]
+    
+    return formatted_timeline
+
+
+def finalize_emotion_summary(analyzer) -> Tuple[Dict[str, Any], float, List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Final results of a real-time emotion analyzer
+    
+    CPU-bound, so it runs on FRAME_POOL; the caller holds the meeting lock.
+    
+    Returns:
+        (summary, engagement_score, emotion_timeline, formatted_timeline)
+    """
+    # Require at least 30 frames (about 1-2 seconds at typical FPS) to be considered a real person
+    summary = analyzer.get_meeting_summary(min_frames_for_summary=30)
+    
+    # Filter out false positives (same as video analysis)
+    filter_active_people(summary)
+    people = summary.get('people', [])
+    
+    engagement_score = calculate_engagement_score(summary.get('overall_emotion_distribution', {}))
+    return summary, engagement_score, build_emotion_timeline(people), build_formatted_timeline(people)
 
 
 class ProcessMeetingRequest(BaseModel):
@@ -49,20 +291,23 @@ async def process_meeting(
     platform: str,
     meeting_id: str,
     request: ProcessMeetingRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    cache_control: Optional[str] = Header(None)
 ):
     """
     Process a meeting with AI
     Fetches transcript, generates summary, extracts action items, etc.
+    Send "Cache-Control: no-cache" to bypass cached AI results.
     """
+    meeting_started = False
     try:
         logger.info(f"Processing meeting {meeting_id}")
         
         # 1. Fetch transcript from Vexa
-        transcript_result = vexa_client.get_transcript(platform, meeting_id)
+        transcript_result = await vexa_client.get_transcript(platform, meeting_id)
         
         if not transcript_result or 'transcript' not in transcript_result:
-            raise HTTPException(status_code=404, detail="Transcript not found")
+            raise TRANSCRIPT_NOT_FOUND.with_traceback(None)
         
         # Parse transcript
         transcript_data = transcript_result['transcript']
@@ -71,120 +316,110 @@ async def process_meeting(
             transcript_text = transcript_data
         elif isinstance(transcript_data, list):
             transcript_segments = transcript_data
-            transcript_text = "\n".join([
-                f"{seg.get('speaker', 'Unknown')}: {seg.get('text', '')}"
+            transcript_text = "\n".join(
+                f"{seg.get('speaker') or 'Unknown'}: {seg.get('text', '')}"
                 for seg in transcript_segments
-            ])
+            )
         else:
             transcript_segments = []
             transcript_text = ""
         
         if not transcript_text:
-            raise HTTPException(status_code=400, detail="Empty transcript")
+            raise EMPTY_TRANSCRIPT.with_traceback(None)
         
         # 2. Create or update meeting record
-        meeting = db.query(Meeting).filter(Meeting.meeting_id == meeting_id).first()
-        if not meeting:
-            meeting = Meeting(
+        # Committed up front so status polling sees "processing" while the
+        # AI calls run, without holding a write transaction open across them
+        # Single upsert on the unique meeting_id, so concurrent requests
+        # for the same meeting can't race between lookup and insert
+        await db.execute(
+            sqlite_insert(Meeting)
+            .values(
                 platform=platform,
                 meeting_id=meeting_id,
                 title=request.title or f"Meeting {meeting_id}",
                 status="processing"
             )
-            db.add(meeting)
-            db.commit()
-            db.refresh(meeting)
-        else:
-            meeting.status = "processing"
-            db.commit()
-        
-        # 3. Save transcript segments
-        # Clear existing transcripts
-        db.query(Transcript).filter(Transcript.meeting_id == meeting_id).delete()
-        
-        for segment in transcript_segments:
-            transcript_record = Transcript(
-                meeting_id=meeting_id,
-                speaker=segment.get('speaker'),
-                timestamp=segment.get('timestamp'),
-                text=segment.get('text', '')
-            )
-            db.add(transcript_record)
-        db.commit()
-        
-        # 4. Generate AI summary
-        summary_data = ai_service.generate_summary(transcript_text)
-        
-        # Save or update summary
-        summary_record = db.query(Summary).filter(Summary.meeting_id == meeting_id).first()
-        if summary_record:
-            summary_record.summary = summary_data.get('summary', '')
-            summary_record.key_points = json.dumps(summary_data.get('key_points', []))
-            summary_record.decisions = json.dumps(summary_data.get('decisions', []))
-        else:
-            summary_record = Summary(
-                meeting_id=meeting_id,
-                summary=summary_data.get('summary', ''),
-                key_points=json.dumps(summary_data.get('key_points', [])),
-                decisions=json.dumps(summary_data.get('decisions', []))
-            )
-            db.add(summary_record)
-        db.commit()
-        
-        # 5. Extract action items
-        action_items_data = ai_service.extract_action_items(transcript_text)
-        
-        # Clear existing action items
-        db.query(ActionItem).filter(ActionItem.meeting_id == meeting_id).delete()
-        
-        for item in action_items_data:
-            action_item = ActionItem(
-                meeting_id=meeting_id,
-                task=item.get('task', ''),
-                owner=item.get('owner', ''),
-                due_date=item.get('due_date', ''),
-                priority=item.get('priority', 'medium'),
-                status='todo'
-            )
-            db.add(action_item)
-        db.commit()
-        
-        # 6. Detect participants
+            .on_conflict_do_update(index_elements=[Meeting.meeting_id], set_={"status": "processing"})
+        )
+        await db.commit()
+        meeting_started = True
+        
+        # 3. Generate summary, action items and emotions in one AI call
+        use_cache = "no-cache" not in (cache_control or "").lower()
+        summary_data = await ai_service.aanalyze_all(transcript_text, use_cache=use_cache)
+        action_items_data = summary_data.get('action_items', [])
+        emotions_data = summary_data.get('emotions', [])
+        
+        # 4. Detect participants
         participants_list = ai_service.detect_participants(transcript_segments)
         
-        # Clear existing participants
-        db.query(Participant).filter(Participant.meeting_id == meeting_id).delete()
+        # 5. Calculate overall emotion score
+        overall_score = ai_service.calculate_overall_emotion_score(emotions_data)
         
-        for name in participants_list:
-            participant = Participant(
-                meeting_id=meeting_id,
-                name=name
-            )
-            db.add(participant)
-        db.commit()
+        # 6. Save all results in a single transaction
+        # Rows are bulk-inserted as plain mappings, skipping ORM unit-of-work
+        await db.execute(delete(Transcript).where(Transcript.meeting_id == meeting_id))
+        await insert_rows(db, Transcript, [
+            {
+                "meeting_id": meeting_id,
+                "speaker": segment.get('speaker'),
+                "timestamp": segment.get('timestamp'),
+                "text": segment.get('text', '')
+            }
+            for segment in transcript_segments
+        ])
         
-        # 7. Analyze emotions
-        emotions_data = ai_service.analyze_emotions(transcript_text)
+        # Save or update summary
+        summary_stmt = sqlite_insert(Summary).values(
+            meeting_id=meeting_id,
+            summary=summary_data.get('summary', ''),
+            key_points=summary_data.get('key_points', []),
+            decisions=summary_data.get('decisions', [])
+        )
+        await db.execute(summary_stmt.on_conflict_do_update(
+            index_elements=[Summary.meeting_id],
+            set_={
+                "summary": summary_stmt.excluded.summary,
+                "key_points": summary_stmt.excluded.key_points,
+                "decisions": summary_stmt.excluded.decisions
+            }
+        ))
         
-        # Clear existing emotions
-        db.query(Emotion).filter(Emotion.meeting_id == meeting_id).delete()
+        await db.execute(delete(ActionItem).where(ActionItem.meeting_id == meeting_id))
+        await insert_rows(db, ActionItem, [
+            {
+                "meeting_id": meeting_id,
+                "task": item.get('task', ''),
+                "owner": item.get('owner', ''),
+                "due_date": item.get('due_date', ''),
+                "priority": item.get('priority', 'medium'),
+                "status": 'todo'
+            }
+            for item in action_items_data
+        ])
         
-        for emotion in emotions_data:
-            emotion_record = Emotion(
-                meeting_id=meeting_id,
-                timestamp=emotion.get('timestamp', ''),
-                emotion=emotion.get('emotion', 'neutral'),
-                intensity=emotion.get('intensity', 0.5)
-            )
-            db.add(emotion_record)
-        db.commit()
+        await db.execute(delete(Participant).where(Participant.meeting_id == meeting_id))
+        await insert_rows(db, Participant, [
+            {"meeting_id": meeting_id, "name": name}
+            for name in participants_list
+        ])
         
-        # 8. Calculate overall emotion score
-        overall_score = ai_service.calculate_overall_emotion_score(emotions_data)
+        await db.execute(delete(Emotion).where(Emotion.meeting_id == meeting_id))
+        await insert_rows(db, Emotion, [
+            {
+                "meeting_id": meeting_id,
+                "timestamp": emotion.get('timestamp', ''),
+                "emotion": emotion.get('emotion', 'neutral'),
+                "intensity": emotion.get('intensity', 0.5)
+            }
+            for emotion in emotions_data
+        ])
         
-        # 9. Update meeting status
-        meeting.status = "completed"
-        db.commit()
+        # 7. Update meeting status
+        await db.execute(update(Meeting).where(Meeting.meeting_id == meeting_id).values(status="completed"))
+        await db.commit()
+        vexa_client.invalidate_transcript(platform, meeting_id)
         
         logger.info(f"Meeting {meeting_id} processed successfully")
         
@@ -202,10 +437,11 @@ async def process_meeting(
         
     except Exception as e:
         logger.error(f"Failed to process meeting: {str(e)}")
-        # Update meeting status to failed
-        if 'meeting' in locals():
-            meeting.status = "failed"
-            db.commit()
+        # Discard partial writes, then record the failure in a fresh transaction
+        await db.rollback()
+        if meeting_started:
+            await db.execute(update(Meeting).where(Meeting.meeting_id == meeting_id).values(status="failed"))
+            await db.commit()
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -213,189 +449,168 @@ async def process_meeting(
 async def get_meeting_summary(
     platform: str,
     meeting_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get AI-generated summary for a meeting"""
-    try:
-        summary = db.query(Summary).filter(Summary.meeting_id == meeting_id).first()
-        
-        if not summary:
-            raise HTTPException(status_code=404, detail="Summary not found. Process the meeting first.")
-        
-        return {
-            "success": True,
-            "summary": summary.summary,
-            "key_points": json.loads(summary.key_points) if summary.key_points else [],
-            "decisions": json.loads(summary.decisions) if summary.decisions else []
-        }
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Failed to get summary: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+    summary = (await db.execute(select(Summary).where(Summary.meeting_id == meeting_id))).scalars().first()
+    
+    if not summary:
+        raise SUMMARY_NOT_FOUND.with_traceback(None)
+    
+    return {
+        "success": True,
+        "summary": summary.summary,
+        "key_points": summary.key_points or [],
+        "decisions": summary.decisions or []
+    }
 
 
 @router.get("/{platform}/{meeting_id}/action-items")
 async def get_action_items(
     platform: str,
     meeting_id: str,
-    db: Session = Depends(get_db)
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_db)
 ):
-    """Get extracted action items for a meeting"""
-    try:
-        action_items = db.query(ActionItem).filter(ActionItem.meeting_id == meeting_id).all()
-        
-        return {
-            "success": True,
-            "action_items": [
-                {
-                    "id": item.id,
-                    "task": item.task,
-                    "owner": item.owner,
-                    "due_date": item.due_date,
-                    "priority": item.priority,
-                    "status": item.status
-                }
-                for item in action_items
-            ]
-        }
-        
-    except Exception as e:
-        logger.error(f"Failed to get action items: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+    """Get extracted action items for a meeting, optionally paginated"""
+    # Select plain columns to skip ORM instance construction
+    action_items = (await db.execute(
+        select(
+            ActionItem.id,
+            ActionItem.task,
+            ActionItem.owner,
+            ActionItem.due_date,
+            ActionItem.priority,
+            ActionItem.status
+        ).where(ActionItem.meeting_id == meeting_id)
+        .order_by(ActionItem.id).offset(offset).limit(limit)
+    )).mappings()
+    
+    return {
+        "success": True,
+        "action_items": [dict(item) for item in action_items]
+    }
 
 
 @router.get("/{platform}/{meeting_id}/participants")
 async def get_participants(
     platform: str,
     meeting_id: str,
-    db: Session = Depends(get_db)
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_db)
 ):
-    """Get participants for a meeting"""
-    try:
-        participants = db.query(Participant).filter(Participant.meeting_id == meeting_id).all()
-        
-        return {
-            "success": True,
-            "participants": [
-                {
-                    "id": p.id,
-                    "name": p.name,
-                    "email": p.email
-                }
-                for p in participants
-            ]
-        }
-        
-    except Exception as e:
-        logger.error(f"Failed to get participants: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+    """Get participants for a meeting, optionally paginated"""
+    participants = (await db.execute(
+        select(Participant.id, Participant.name, Participant.email)
+        .where(Participant.meeting_id == meeting_id)
+        .order_by(Participant.id).offset(offset).limit(limit)
+    )).mappings()
+    
+    return {
+        "success": True,
+        "participants": [dict(p) for p in participants]
+    }
 
 
 @router.get("/{platform}/{meeting_id}/emotions")
 async def get_emotions(
     platform: str,
     meeting_id: str,
-    db: Session = Depends(get_db)
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_db)
 ):
-    """Get emotion analysis for a meeting"""
-    try:
-        emotions = db.query(Emotion).filter(Emotion.meeting_id == meeting_id).all()
-        
-        emotion_data = [
-            {
-                "timestamp": e.timestamp,
-                "emotion": e.emotion,
-                "intensity": e.intensity
-            }
-            for e in emotions
-        ]
-        
-        overall_score = ai_service.calculate_overall_emotion_score(emotion_data)
-        
-        # Calculate engagement score (same as overall_score, but named for clarity)
-        engagement_score = overall_score
-        
-        return {
-            "success": True,
-            "overall_score": overall_score,
-            "engagement_score": engagement_score,
-            "timeline": emotion_data
-        }
-        
-    except Exception as e:
-        logger.error(f"Failed to get emotions: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+    """Get emotion analysis for a meeting, optionally paginating the timeline"""
+    emotions = (await db.execute(
+        select(Emotion.timestamp, Emotion.emotion, Emotion.intensity)
+        .where(Emotion.meeting_id == meeting_id)
+        .order_by(Emotion.id).offset(offset).limit(limit)
+    )).mappings()
+    
+    emotion_data = [dict(e) for e in emotions]
+    
+    # The score always covers the whole meeting, not just the requested page
+    if limit is None and offset == 0:
+        score_data = emotion_data
+    else:
+        score_data = (await db.execute(
+            select(Emotion.emotion, Emotion.intensity)
+            .where(Emotion.meeting_id == meeting_id)
+        )).mappings().all()
+    
+    overall_score = ai_service.calculate_overall_emotion_score(score_data)
+    
+    # Calculate engagement score (same as overall_score, but named for clarity)
+    engagement_score = overall_score
+    
+    return {
+        "success": True,
+        "overall_score": overall_score,
+        "engagement_score": engagement_score,
+        "timeline": emotion_data
+    }
 
 
 @router.get("/{platform}/{meeting_id}/status")
 async def get_meeting_status(
     platform: str,
     meeting_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get processing status of a meeting"""
-    try:
-        meeting = db.query(Meeting).filter(Meeting.meeting_id == meeting_id).first()
-        
-        if not meeting:
-            return {
-                "success": True,
-                "status": "not_processed",
-                "message": "Meeting has not been processed yet"
-            }
-        
+    meeting = (await db.execute(select(Meeting).where(Meeting.meeting_id == meeting_id))).scalars().first()
+    
+    if not meeting:
         return {
             "success": True,
-            "status": meeting.status,
-            "title": meeting.title,
-            "date": meeting.date.isoformat() if meeting.date else None
+            "status": "not_processed",
+            "message": "Meeting has not been processed yet"
         }
-        
-    except Exception as e:
-        logger.error(f"Failed to get meeting status: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+    
+    return {
+        "success": True,
+        "status": meeting.status,
+        "title": meeting.title,
+        "date": meeting.date.isoformat() if meeting.date else None
+    }
 
 
 @router.post("/analyze-video-emotions")
 async def analyze_video_emotions(
     file: UploadFile = File(...),
     meeting_id: Optional[str] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Analyze emotions from a video file using the emotion detection model.
     This endpoint processes video files and returns emotion analysis results.
     """
+    video_path = None
     try:
         # Validate file type
         if not file.content_type or not file.content_type.startswith('video/'):
-            raise HTTPException(status_code=400, detail="File must be a video")
-        
-        # Check file size (limit to 500MB)
-        file_size = 0
-        content = b""
-        async for chunk in file.stream():
-            content += chunk
-            file_size += len(chunk)
-            if file_size > 500 * 1024 * 1024:  # 500MB limit
-                raise HTTPException(status_code=413, detail="File too large. Maximum size is 500MB.")
+            raise NOT_A_VIDEO.with_traceback(None)
         
-        logger.info(f"Processing video emotion analysis for file: {file.filename}, Size: {file_size / 1024 / 1024:.2f} MB")
+        if analyze_meeting_video is None:
+            raise EMOTION_ANALYSIS_UNAVAILABLE.with_traceback(None)
         
-        # Save uploaded file to temporary location
-        video_path = None
+        # Stream the upload to a temporary file chunk by chunk, enforcing
+        # the size limit as data arrives instead of buffering it in memory
+        file_size = 0
         with tempfile.NamedTemporaryFile(delete=False, suffix='.mp4') as tmp_file:
-            tmp_file.write(content)
             video_path = tmp_file.name
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                file_size += len(chunk)
+                if file_size > MAX_VIDEO_SIZE:
+                    raise FILE_TOO_LARGE.with_traceback(None)
+                # Disk writes run in a worker thread so the event loop never blocks on write(2)
+                await asyncio.to_thread(tmp_file.write, chunk)
+        
+        logger.info(f"Processing video emotion analysis for file: {file.filename}, Size: {file_size / 1024 / 1024:.2f} MB")
         
         try:
-            # Import emotion analyzer
-            sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'Sales_emotion_module'))
-            from meeting_emotion_analyzer import analyze_meeting_video
-            from config import MODEL_PATH, MODEL_TYPE_PROD
-            
             # Analyze video
             logger.info("Starting video emotion analysis...")
             summary = analyze_meeting_video(
@@ -407,53 +622,13 @@ async def analyze_video_emotions(
             
             # Filter out false positives (same as real-time analysis)
             meeting_duration = summary.get('meeting_duration', 0)
-            if meeting_duration > 0:
-                min_duration_seconds = max(meeting_duration * 0.05, 3.0)  # At least 5% of meeting or 3 seconds minimum
-                filtered_people = []
-                for person_data in summary.get('people', []):
-                    person_duration = person_data.get('total_duration', 0)
-                    total_frames = person_data.get('total_frames', 0)
-                    if person_duration >= min_duration_seconds and total_frames >= 30:
-                        filtered_people.append(person_data)
-                    else:
-                        logger.info(f"Filtered out person {person_data.get('person_id')} - duration: {person_duration:.1f}s, frames: {total_frames}")
-                
-                summary['people'] = filtered_people
-                summary['total_people_active'] = len(filtered_people)
-                
-                # Renumber people to be sequential
-                for idx, person_data in enumerate(filtered_people, 1):
-                    person_data['person_id'] = idx
-                    person_data['person_name'] = f"Person {idx}"
+            filter_active_people(summary)
             
             # Convert summary to API response format
-            emotion_timeline = []
             overall_emotion_distribution = summary.get('overall_emotion_distribution', {})
             
             # Create timeline from per-person data and speaking sessions
-            # Sample emotions at regular intervals based on session data
-            for person_data in summary.get('people', []):
-                for session in person_data.get('speaking_sessions', []):
-                    session_start = session.get('start_time', 0)
-                    session_end = session.get('end_time', session_start)
-                    session_duration = session.get('duration', 0)
-                    dominant_emotion = session.get('dominant_emotion', 'neutral')
-                    avg_confidence = session.get('average_confidence', 0.5)
-                    
-                    # Create timeline points for this session (sample every 5 seconds)
-                    if session_duration > 0:
-                        num_samples = max(1, int(session_duration / 5))
-                        for i in range(num_samples):
-                            timestamp_seconds = session_start + (i * session_duration / num_samples)
-                            minutes = int(timestamp_seconds // 60)
-                            seconds = int(timestamp_seconds % 60)
-                            timestamp_str = f"{minutes:02d}:{seconds:02d}"
-                            
-                            emotion_timeline.append({
-                                "timestamp": timestamp_str,
-                                "emotion": dominant_emotion.lower() if dominant_emotion else 'neutral',
-                                "intensity": avg_confidence
-                            })
+            emotion_timeline = build_emotion_timeline(summary.get('people', []))
             
             # If no timeline created, create samples from overall distribution
             if not emotion_timeline and meeting_duration > 0:
@@ -473,41 +648,16 @@ async def analyze_video_emotions(
                     })
             
             # Calculate overall engagement score
-            # Map emotions to scores: happy=high, neutral=medium, others=low
-            emotion_scores = {
-                'happy': 0.9,
-                'neutral': 0.6,
-                'sad': 0.3,
-                'angry': 0.2,
-                'fear': 0.3,
-                'surprise': 0.7,
-                'disgust': 0.2
-            }
-            
-            total_score = 0
-            total_count = 0
-            for emotion, count in overall_emotion_distribution.items():
-                emotion_lower = emotion.lower()
-                score = emotion_scores.get(emotion_lower, 0.5)
-                total_score += score * count
-                total_count += count
-            
-            engagement_score = (total_score / total_count * 10) if total_count > 0 else 5.0
+            engagement_score = calculate_engagement_score(overall_emotion_distribution)
             
             # Save emotions to database if meeting_id provided
             if meeting_id:
                 # Clear existing emotions
-                db.query(Emotion).filter(Emotion.meeting_id == meeting_id).delete()
+                await db.execute(delete(Emotion).where(Emotion.meeting_id == meeting_id))
                 
-                for emotion_point in emotion_timeline:
-                    emotion_record = Emotion(
-                        meeting_id=meeting_id,
-                        timestamp=emotion_point['timestamp'],
-                        emotion=emotion_point['emotion'],
-                        intensity=emotion_point['intensity']
-                    )
-                    db.add(emotion_record)
-                db.commit()
+                # Timeline points already have the Emotion column keys
+                await insert_rows(db, Emotion, emotion_timeline, meeting_id=meeting_id)
+                await db.commit()
             
             # Prepare response
             response_data = {
@@ -523,7 +673,7 @@ async def analyze_video_emotions(
                     "people": [
                         {
                             "person_id": p.get('person_id'),
-                            "person_name": p.get('person_name', f"Person {p.get('person_id')}"),
+                            "person_name": p.get('person_name') or f"Person {p.get('person_id')}",
                             "dominant_emotion": p.get('dominant_emotion'),
                             "emotion_percentages": p.get('emotion_percentages', {}),
                             "speaking_percentage": p.get('speaking_percentage', 0)
@@ -539,9 +689,7 @@ async def analyze_video_emotions(
         except HTTPException:
             raise
         except Exception as e:
-            logger.error(f"Failed to analyze video emotions: {str(e)}")
-            import traceback
-            logger.error(traceback.format_exc())
+            logger.exception(f"Failed to analyze video emotions: {str(e)}")
             error_detail = str(e)
             # Provide more helpful error messages
             if "No such file" in error_detail or "model" in error_detail.lower():
@@ -576,14 +724,14 @@ async def analyze_video_emotions(
 async def start_emotion_analysis(
     platform: str,
     meeting_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Start real-time emotion analysis for a meeting.
     This initializes the emotion analyzer and starts tracking emotions.
     """
     try:
-        with emotion_analysis_lock:
+        async with emotion_analysis_lock:
             if meeting_id in active_emotion_analyzers:
                 return {
                     "success": True,
@@ -591,10 +739,8 @@ async def start_emotion_analysis(
                     "meeting_id": meeting_id
                 }
             
-            # Import emotion analyzer
-            sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'Sales_emotion_module'))
-            from meeting_emotion_analyzer import MeetingEmotionAnalyzer
-            from config import MODEL_PATH, MODEL_TYPE_PROD
+            if MeetingEmotionAnalyzer is None:
+                raise EMOTION_ANALYSIS_UNAVAILABLE.with_traceback(None)
             
             # Initialize analyzer with stricter settings to reduce false positives
             analyzer = MeetingEmotionAnalyzer(
@@ -612,16 +758,22 @@ async def start_emotion_analysis(
                 'minSize': (40, 40)
             }
             
-            # Store analyzer
+            # Store analyzer; the ISO start time is formatted once for status polls
+            start_time = time.time()
             active_emotion_analyzers[meeting_id] = {
                 'analyzer': analyzer,
-                'start_time': time.time(),
+                'start_time': start_time,
+                'start_time_iso': datetime.fromtimestamp(start_time).isoformat(),
                 'platform': platform,
-                'frames_processed': 0
+                'frames_processed': 0,
+                'pending_emotions': [],
+                'last_save_time': start_time,
+                'lock': asyncio.Lock(),
+                'stopped': False
             }
             
             # Create or update meeting record
-            meeting = db.query(Meeting).filter(Meeting.meeting_id == meeting_id).first()
+            meeting = (await db.execute(select(Meeting).where(Meeting.meeting_id == meeting_id))).scalars().first()
             if not meeting:
                 meeting = Meeting(
                     platform=platform,
@@ -632,7 +784,7 @@ async def start_emotion_analysis(
                 db.add(meeting)
             else:
                 meeting.status = "active"
-            db.commit()
+            await db.commit()
             
             logger.info(f"Started emotion analysis for meeting {meeting_id}")
             
@@ -643,10 +795,10 @@ async def start_emotion_analysis(
                 "start_time": datetime.utcnow().isoformat()
             }
             
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Failed to start emotion analysis: {str(e)}")
-        import traceback
-        logger.error(traceback.format_exc())
+        logger.exception(f"Failed to start emotion analysis: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to start emotion analysis: {str(e)}")
 
 
@@ -655,75 +807,75 @@ async def process_emotion_frame(
     platform: str,
     meeting_id: str,
     file: UploadFile = File(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Process a single video frame for emotion analysis.
     This endpoint accepts image frames and processes them in real-time.
     """
     try:
-        with emotion_analysis_lock:
-            if meeting_id not in active_emotion_analyzers:
-                raise HTTPException(
-                    status_code=400,
-                    detail="Emotion analysis not started for this meeting. Call start-emotion-analysis first."
-                )
-            
-            analyzer_data = active_emotion_analyzers[meeting_id]
-            analyzer = analyzer_data['analyzer']
-            
-            # Read frame data
-            import cv2
-            import numpy as np
-            from PIL import Image
-            import io
-            
-            content = await file.read()
-            image = Image.open(io.BytesIO(content))
-            frame = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
-            
-            # Process frame
-            result = analyzer.process_frame(frame, detect_speakers=True)
+        # Lock-free lookup: the dict entry is only added/removed under
+        # emotion_analysis_lock, and a single dict read is atomic
+        analyzer_data = active_emotion_analyzers.get(meeting_id)
+        if analyzer_data is None:
+            raise EMOTION_ANALYSIS_NOT_STARTED.with_traceback(None)
+        
+        analyzer = analyzer_data['analyzer']
+        
+        # Decode the JPEG/PNG bytes straight into a BGR frame
+        content = await file.read()
+        frame = cv2.imdecode(np.frombuffer(content, dtype=np.uint8), cv2.IMREAD_COLOR)
+        if frame is None:
+            raise INVALID_FRAME.with_traceback(None)
+        
+        # Only frames of the same meeting are serialized, since they share analyzer state
+        async with analyzer_data['lock']:
+            # Stop may have finalized the analyzer while this frame waited for the lock
+            if analyzer_data['stopped']:
+                raise EMOTION_ANALYSIS_NOT_RUNNING.with_traceback(None)
+            
+            # Face detection and inference run in a worker thread; OpenCV and
+            # TensorFlow release the GIL, so other requests keep being served
+            result = await asyncio.get_running_loop().run_in_executor(
+                FRAME_POOL, partial(analyzer.process_frame, frame, detect_speakers=True)
+            )
             
             # Update frame count
             analyzer_data['frames_processed'] += 1
             
-            # Save emotions to database periodically (every 10 frames or every 5 seconds)
+            # Buffer a sampled frame's emotions and write them in batches
             current_time = time.time()
-            if not hasattr(analyzer_data, 'last_save_time'):
-                analyzer_data['last_save_time'] = current_time
-            
-            if analyzer_data['frames_processed'] % 10 == 0 or (current_time - analyzer_data['last_save_time']) >= 5:
-                # Save recent emotions to database
-                for frame_result in result.get('frame_results', []):
-                    timestamp_seconds = current_time - analyzer_data['start_time']
-                    minutes = int(timestamp_seconds // 60)
-                    seconds = int(timestamp_seconds % 60)
-                    timestamp_str = f"{minutes:02d}:{seconds:02d}"
-                    
-                    emotion_record = Emotion(
-                        meeting_id=meeting_id,
-                        timestamp=timestamp_str,
-                        emotion=frame_result.get('emotion', 'neutral').lower(),
-                        intensity=frame_result.get('confidence', 0.5)
-                    )
-                    db.add(emotion_record)
-                db.commit()
-                analyzer_data['last_save_time'] = current_time
-            
-            return {
-                "success": True,
-                "frames_processed": result.get('faces_detected', 0),
-                "people_tracked": result.get('people_tracked', 0),
-                "frame_results": result.get('frame_results', [])
-            }
+            if analyzer_data['frames_processed'] % EMOTION_SAMPLE_EVERY == 0:
+                timestamp_seconds = current_time - analyzer_data['start_time']
+                minutes = int(timestamp_seconds // 60)
+                seconds = int(timestamp_seconds % 60)
+                timestamp_str = f"{minutes:02d}:{seconds:02d}"
+                
+                analyzer_data['pending_emotions'].extend(
+                    {
+                        "meeting_id": meeting_id,
+                        "timestamp": timestamp_str,
+                        "emotion": frame_result.get('emotion', 'neutral').lower(),
+                        "intensity": frame_result.get('confidence', 0.5)
+                    }
+                    for frame_result in result.get('frame_results', [])
+                )
             
+            # Flushed under the lock so no rows can land after stop replaces them
+            if len(analyzer_data['pending_emotions']) >= EMOTION_FLUSH_ROWS or (current_time - analyzer_data['last_save_time']) >= EMOTION_FLUSH_INTERVAL:
+                await flush_pending_emotions(db, analyzer_data)
+        
+        return {
+            "success": True,
+            "frames_processed": result.get('faces_detected', 0),
+            "people_tracked": result.get('people_tracked', 0),
+            "frame_results": result.get('frame_results', [])
+        }
+        
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Failed to process emotion frame: {str(e)}")
-        import traceback
-        logger.error(traceback.format_exc())
+        logger.exception(f"Failed to process emotion frame: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to process frame: {str(e)}")
 
 
@@ -731,157 +883,51 @@ async def process_emotion_frame(
 async def stop_emotion_analysis(
     platform: str,
     meeting_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Stop emotion analysis and get the final meeting mood summary.
     """
     try:
-        with emotion_analysis_lock:
+        async with emotion_analysis_lock:
             if meeting_id not in active_emotion_analyzers:
-                raise HTTPException(
-                    status_code=400,
-                    detail="Emotion analysis not running for this meeting"
-                )
+                raise EMOTION_ANALYSIS_NOT_RUNNING.with_traceback(None)
             
             analyzer_data = active_emotion_analyzers[meeting_id]
             analyzer = analyzer_data['analyzer']
             
-            # Get meeting summary with higher threshold to filter false positives
-            # Require at least 30 frames (about 1-2 seconds at typical FPS) to be considered a real person
-            summary = analyzer.get_meeting_summary(min_frames_for_summary=30)
-            
-            # Additional filtering: Only keep people who were seen for at least 5% of meeting duration
-            # This is more aggressive to filter out false positives
-            meeting_duration = summary.get('meeting_duration', 0)
-            if meeting_duration > 0:
-                min_duration_seconds = max(meeting_duration * 0.05, 3.0)  # At least 5% of meeting or 3 seconds minimum
-                filtered_people = []
-                for person_data in summary.get('people', []):
-                    person_duration = person_data.get('total_duration', 0)
-                    total_frames = person_data.get('total_frames', 0)
-                    # Must meet both duration and frame count requirements
-                    if person_duration >= min_duration_seconds and total_frames >= 30:
-                        filtered_people.append(person_data)
-                    else:
-                        logger.info(f"Filtered out person {person_data.get('person_id')} - duration: {person_duration:.1f}s (min: {min_duration_seconds:.1f}s), frames: {total_frames} (min: 30)")
-                
-                summary['people'] = filtered_people
-                summary['total_people_active'] = len(filtered_people)
-                
-                # Renumber people to be sequential (Person 1, Person 2, etc.)
-                for idx, person_data in enumerate(filtered_people, 1):
-                    old_id = person_data.get('person_id')
-                    person_data['person_id'] = idx
-                    person_data['person_name'] = f"Person {idx}"
-                    logger.info(f"Renumbered person {old_id} to Person {idx}")
-            
-            # Calculate overall engagement score
+            # Summarize, filter and build the timelines in a worker thread so the
+            # event loop keeps serving requests; waits for any frame of this
+            # meeting that is still being processed. Frames still queued on the
+            # lock see 'stopped' and are rejected instead of touching the
+            # finalized analyzer or writing rows after the final timeline.
+            async with analyzer_data['lock']:
+                summary, engagement_score, emotion_timeline, formatted_timeline = (
+                    await asyncio.get_running_loop().run_in_executor(
+                        FRAME_POOL, finalize_emotion_summary, analyzer
+                    )
+                )
+                analyzer_data['stopped'] = True
             overall_emotion_distribution = summary.get('overall_emotion_distribution', {})
-            emotion_scores = {
-                'happy': 0.9,
-                'neutral': 0.6,
-                'sad': 0.3,
-                'angry': 0.2,
-                'fear': 0.3,
-                'surprise': 0.7,
-                'disgust': 0.2
-            }
-            
-            total_score = 0
-            total_count = 0
-            for emotion, count in overall_emotion_distribution.items():
-                emotion_lower = emotion.lower()
-                score = emotion_scores.get(emotion_lower, 0.5)
-                total_score += score * count
-                total_count += count
-            
-            engagement_score = (total_score / total_count * 10) if total_count > 0 else 5.0
-            
-            # Create emotion timeline
-            emotion_timeline = []
             meeting_duration = summary.get('meeting_duration', 0)
             
-            for person_data in summary.get('people', []):
-                for session in person_data.get('speaking_sessions', []):
-                    session_start = session.get('start_time', 0)
-                    session_duration = session.get('duration', 0)
-                    dominant_emotion = session.get('dominant_emotion', 'neutral')
-                    avg_confidence = session.get('average_confidence', 0.5)
-                    
-                    if session_duration > 0:
-                        num_samples = max(1, int(session_duration / 5))
-                        for i in range(num_samples):
-                            timestamp_seconds = session_start + (i * session_duration / num_samples)
-                            minutes = int(timestamp_seconds // 60)
-                            seconds = int(timestamp_seconds % 60)
-                            timestamp_str = f"{minutes:02d}:{seconds:02d}"
-                            
-                            emotion_timeline.append({
-                                "timestamp": timestamp_str,
-                                "emotion": dominant_emotion.lower() if dominant_emotion else 'neutral',
-                                "intensity": avg_confidence
-                            })
-            
             # Save all emotions to database
-            db.query(Emotion).filter(Emotion.meeting_id == meeting_id).delete()
-            for emotion_point in emotion_timeline:
-                emotion_record = Emotion(
-                    meeting_id=meeting_id,
-                    timestamp=emotion_point['timestamp'],
-                    emotion=emotion_point['emotion'],
-                    intensity=emotion_point['intensity']
-                )
-                db.add(emotion_record)
-            
-            # Update meeting status
-            meeting = db.query(Meeting).filter(Meeting.meeting_id == meeting_id).first()
-            if meeting:
-                meeting.status = "completed"
-                if meeting_duration:
-                    meeting.duration = int(meeting_duration / 60)  # Convert to minutes
+            await db.execute(delete(Emotion).where(Emotion.meeting_id == meeting_id))
+            await insert_rows(db, Emotion, emotion_timeline, meeting_id=meeting_id)
+            
+            # Update meeting status in the same transaction, without loading the row
+            meeting_values = {"status": "completed"}
+            if meeting_duration:
+                meeting_values["duration"] = int(meeting_duration / 60)  # Convert to minutes
+            await db.execute(
+                update(Meeting).where(Meeting.meeting_id == meeting_id).values(**meeting_values)
+            )
             
-            db.commit()
+            await db.commit()
             
             # Remove analyzer from active list
             del active_emotion_analyzers[meeting_id]
             
-            # Create formatted timeline with time ranges
-            formatted_timeline = []
-            for person_data in summary.get('people', []):
-                person_name = person_data.get('person_name', f"Person {person_data.get('person_id')}")
-                for session in person_data.get('speaking_sessions', []):
-                    session_start = session.get('start_time', 0)
-                    session_end = session.get('end_time', session_start)
-                    session_duration = session.get('duration', 0)
-                    dominant_emotion = session.get('dominant_emotion', 'neutral')
-                    
-                    if session_duration > 0:
-                        # Create 10-second segments
-                        segment_duration = 10.0
-                        num_segments = max(1, int(session_duration / segment_duration))
-                        
-                        for i in range(num_segments):
-                            segment_start = session_start + (i * segment_duration)
-                            segment_end = min(session_start + ((i + 1) * segment_duration), session_end)
-                            
-                            def format_time(seconds: float) -> str:
-                                minutes = int(seconds // 60)
-                                secs = int(seconds % 60)
-                                return f"{minutes:02d}:{secs:02d}"
-                            
-                            time_range = f"{format_time(segment_start)} to {format_time(segment_end)}"
-                            formatted_timeline.append({
-                                "time_range": time_range,
-                                "person": person_name,
-                                "emotion": dominant_emotion.capitalize() if dominant_emotion else 'Neutral',
-                                "start_time": segment_start,
-                                "end_time": segment_end
-                            })
-            
-            # Sort by start time
-            formatted_timeline.sort(key=lambda x: x['start_time'])
-            
             # Prepare response
             response_data = {
                 "success": True,
@@ -899,7 +945,7 @@ async def stop_emotion_analysis(
                     "people": [
                         {
                             "person_id": p.get('person_id'),
-                            "person_name": p.get('person_name', f"Person {p.get('person_id')}"),
+                            "person_name": p.get('person_name') or f"Person {p.get('person_id')}",
                             "dominant_emotion": p.get('dominant_emotion'),
                             "emotion_percentages": p.get('emotion_percentages', {}),
                             "speaking_percentage": p.get('speaking_percentage', 0)
@@ -915,9 +961,7 @@ async def stop_emotion_analysis(
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Failed to stop emotion analysis: {str(e)}")
-        import traceback
-        logger.error(traceback.format_exc())
+        logger.exception(f"Failed to stop emotion analysis: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to stop emotion analysis: {str(e)}")
 
 
@@ -929,26 +973,20 @@ async def get_emotion_analysis_status(
     """
     Get the current status of emotion analysis for a meeting.
     """
-    try:
-        with emotion_analysis_lock:
-            if meeting_id not in active_emotion_analyzers:
-                return {
-                    "success": True,
-                    "is_running": False,
-                    "message": "Emotion analysis not running"
-                }
-            
-            analyzer_data = active_emotion_analyzers[meeting_id]
-            elapsed_time = time.time() - analyzer_data['start_time']
-            
-            return {
-                "success": True,
-                "is_running": True,
-                "start_time": datetime.fromtimestamp(analyzer_data['start_time']).isoformat(),
-                "elapsed_time_seconds": round(elapsed_time, 2),
-                "frames_processed": analyzer_data['frames_processed']
-            }
-            
-    except Exception as e:
-        logger.error(f"Failed to get emotion analysis status: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+    analyzer_data = active_emotion_analyzers.get(meeting_id)
+    if analyzer_data is None:
+        return {
+            "success": True,
+            "is_running": False,
+            "message": "Emotion analysis not running"
+        }
+    
+    elapsed_time = time.time() - analyzer_data['start_time']
+    
+    return {
+        "success": True,
+        "is_running": True,
+        "start_time": analyzer_data['start_time_iso'],
+        "elapsed_time_seconds": round(elapsed_time, 2),
+        "frames_processed": analyzer_data['frames_processed']
+    }
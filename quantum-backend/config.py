@@ -24,6 +24,9 @@ class Settings(BaseSettings):
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
     
+    # Password Hashing Configuration
+    bcrypt_rounds: int = 10
+    
     # CORS Configuration
     frontend_url: str = "http://localhost:3000"
     
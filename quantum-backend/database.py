@@ -2,10 +2,13 @@
 Database models for meeting intelligence
 """
 
-from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, Float, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, Float, ForeignKey, Index, JSON, event
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, relationship
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import relationship
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from datetime import datetime
+import orjson
 
 Base = declarative_base()
 
@@ -33,7 +36,7 @@ class Transcript(Base):
     __tablename__ = "transcripts"
     
     id = Column(Integer, primary_key=True, index=True)
-    meeting_id = Column(String, ForeignKey("meetings.meeting_id"), nullable=False)
+    meeting_id = Column(String, ForeignKey("meetings.meeting_id"), nullable=False, index=True)
     speaker = Column(String)
     timestamp = Column(String)
     text = Column(Text, nullable=False)
@@ -47,8 +50,8 @@ class Summary(Base):
     id = Column(Integer, primary_key=True, index=True)
     meeting_id = Column(String, ForeignKey("meetings.meeting_id"), unique=True, nullable=False)
     summary = Column(Text)
-    key_points = Column(Text)  # JSON string
-    decisions = Column(Text)  # JSON string
+    key_points = Column(JSON)  # list of strings
+    decisions = Column(JSON)  # list of strings
     created_at = Column(DateTime, default=datetime.utcnow)
     
     meeting = relationship("Meeting", back_populates="summary")
@@ -58,7 +61,7 @@ class ActionItem(Base):
     __tablename__ = "action_items"
     
     id = Column(Integer, primary_key=True, index=True)
-    meeting_id = Column(String, ForeignKey("meetings.meeting_id"), nullable=False)
+    meeting_id = Column(String, ForeignKey("meetings.meeting_id"), nullable=False, index=True)
     task = Column(String, nullable=False)
     owner = Column(String)
     due_date = Column(String)
@@ -72,7 +75,7 @@ class Participant(Base):
     __tablename__ = "participants"
     
     id = Column(Integer, primary_key=True, index=True)
-    meeting_id = Column(String, ForeignKey("meetings.meeting_id"), nullable=False)
+    meeting_id = Column(String, ForeignKey("meetings.meeting_id"), nullable=False, index=True)
     name = Column(String, nullable=False)
     email = Column(String)
     
@@ -81,6 +84,10 @@ class Participant(Base):
 
 class Emotion(Base):
     __tablename__ = "emotions"
+    # Also serves plain meeting_id lookups, as its leading column
+    __table_args__ = (
+        Index("ix_emotions_meeting_id_timestamp", "meeting_id", "timestamp"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     meeting_id = Column(String, ForeignKey("meetings.meeting_id"), nullable=False)
@@ -92,18 +99,52 @@ class Emotion(Base):
 
 
 # Database setup
-DATABASE_URL = "sqlite:///./quantum_meetings.db"
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
-def init_db():
-    """Initialize database tables"""
-    Base.metadata.create_all(bind=engine)
-
-def get_db():
+DATABASE_URL = "sqlite+aiosqlite:///./quantum_meetings.db"
+# JSON columns are (de)serialized with orjson instead of the stdlib json module.
+# aiosqlite file databases default to NullPool, which opens a connection (and
+# its worker thread) and reruns the pragmas below for every session; keep a
+# small pool of open connections instead. WAL lets pooled readers run in parallel.
+engine = create_async_engine(
+    DATABASE_URL,
+    poolclass=AsyncAdaptedQueuePool,
+    pool_size=5,
+    max_overflow=10,
+    json_serializer=lambda obj: orjson.dumps(obj).decode(),
+    json_deserializer=orjson.loads
+)
+
+
+@event.listens_for(engine.sync_engine, "connect")
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Tune each new SQLite connection for concurrent reads and cheaper commits"""
+    cursor = dbapi_connection.cursor()
+    # WAL lets readers proceed during a write; NORMAL only fsyncs at checkpoints
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA mmap_size=268435456")  # 256MB
+    cursor.execute("PRAGMA cache_size=-65536")  # 64MB
+    cursor.close()
+
+# expire_on_commit=False so attributes stay readable after commit without
+# an implicit (and, under asyncio, disallowed) lazy refresh
+SessionLocal = async_sessionmaker(engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+
+def create_indexes(connection):
+    """Create indexes missing from tables built by an older schema"""
+    # create_all only builds indexes for new tables
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=connection, checkfirst=True)
+
+async def init_db():
+    """Initialize database tables and indexes"""
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(create_indexes)
+
+async def get_db():
     """Get database session"""
-    db = SessionLocal()
-    try:
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
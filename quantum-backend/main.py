@@ -2,24 +2,74 @@
 Main FastAPI application
 """
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
+from contextlib import asynccontextmanager
 from config import settings
+from database import engine, init_db
+from services.vexa_client import vexa_client, VexaAPIError
 import logging
+import logging.handlers
+import queue
+
+# Configure logging. Handlers only enqueue records; a listener thread does
+# the formatting and console I/O, so request handlers never block on logging.
+log_queue = queue.SimpleQueue()
+log_handler = logging.StreamHandler()
+log_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+log_listener = logging.handlers.QueueListener(log_queue, log_handler)
+# Added directly rather than via basicConfig, which would give the queue
+# handler the default format too and prefix every line twice
+root_logger = logging.getLogger()
+root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+root_logger.setLevel(logging.INFO)
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application startup and shutdown"""
+    # Records logged before startup wait in the queue until the listener runs
+    log_listener.start()
+    # Create tables once per process, after settings are loaded
+    await init_db()
+    yield
+    await vexa_client.aclose()
+    await engine.dispose()
+    # Flushes queued records before returning
+    log_listener.stop()
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 
 # Create FastAPI app
 app = FastAPI(
     title="Quantum API",
     description="AI-Powered Meeting Intelligence Platform API",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
+# Translate unhandled endpoint errors into a 500 JSON response in one place.
+# Registered before CORS so error responses still carry CORS headers
+# (an exception_handler for Exception would run outside the CORS middleware).
+@app.middleware("http")
+async def handle_unexpected_errors(request: Request, call_next):
+    try:
+        return await call_next(request)
+    except Exception as e:
+        logger.exception("%s %s failed", request.method, request.url.path)
+        return ORJSONResponse(status_code=500, content={"detail": str(e)})
+
+
+# Vexa failures keep the upstream status (502 when there was no response),
+# so a missing meeting reaches the client as 404 rather than a blanket 500
+@app.exception_handler(VexaAPIError)
+async def handle_vexa_error(request: Request, e: VexaAPIError):
+    return ORJSONResponse(status_code=e.status_code or 502, content={"detail": str(e)})
+
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
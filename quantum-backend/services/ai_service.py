@@ -5,8 +5,14 @@ Uses Google Gemini for summarization and extraction
 
 import google.generativeai as genai
 from config import settings
+from services.cache import TTLCache
+import asyncio
+import hashlib
 import json
 import logging
+import numpy as np
+import orjson
+import re
 from typing import List, Dict, Any
 
 logger = logging.getLogger(__name__)
@@ -15,77 +21,48 @@ logger = logging.getLogger(__name__)
 genai.configure(api_key=settings.gemini_api_key)
 model = genai.GenerativeModel('gemini-pro')
 
+# Successful combined analyses, keyed by method + SHA-256 of the transcript.
+# Results are stored serialized so callers never share a mutable dict.
+ANALYSIS_CACHE_TTL = 3600
+analysis_cache = TTLCache(maxsize=256, ttl=ANALYSIS_CACHE_TTL)
 
-class AIService:
-    """AI service for processing meeting transcripts"""
-    
-    @staticmethod
-    def generate_summary(transcript_text: str) -> Dict[str, Any]:
-        """
-        Generate meeting summary from transcript
-        
-        Args:
-            transcript_text: Full meeting transcript
-            
-        Returns:
-            Dict with summary, key_points, and decisions
-        """
-        try:
-            prompt = f"""
+# Base score for each emotion label, weighted by intensity in the overall score
+EMOTION_SCORES = {
+    "happy": 9.0,
+    "neutral": 7.0,
+    "concerned": 5.0,
+    "frustrated": 3.0
+}
+
+
+# Markdown code fence wrapped around JSON responses
+_FENCE = re.compile(r"^\s*```(?:json)?\s*|\s*```\s*$", re.IGNORECASE)
+_JSON_DECODER = json.JSONDecoder()
+
+
+# Prompt templates, built once; the transcript is concatenated between
+# prefix and suffix instead of formatting an f-string on every call
+_SUMMARY_PROMPT_PREFIX = """
 Analyze this meeting transcript and provide:
 1. A concise summary (2-3 sentences)
 2. Key discussion points (as a bullet list)
 3. Important decisions made (as a bullet list)
 
 Format your response as JSON:
-{{
+{
     "summary": "Brief summary here",
     "key_points": ["Point 1", "Point 2", "Point 3"],
     "decisions": ["Decision 1", "Decision 2"]
-}}
+}
 
 Transcript:
-{transcript_text}
+"""
+_SUMMARY_PROMPT_SUFFIX = """
 
 Respond ONLY with valid JSON, no additional text.
 """
-            
-            response = model.generate_content(prompt)
-            result_text = response.text.strip()
-            
-            # Remove markdown code blocks if present
-            if result_text.startswith("```json"):
-                result_text = result_text[7:]
-            if result_text.startswith("```"):
-                result_text = result_text[3:]
-            if result_text.endswith("```"):
-                result_text = result_text[:-3]
-            
-            result = json.loads(result_text.strip())
-            logger.info("Summary generated successfully")
-            return result
-            
-        except Exception as e:
-            logger.error(f"Failed to generate summary: {str(e)}")
-            return {
-                "summary": "Failed to generate summary",
-                "key_points": [],
-                "decisions": []
-            }
-    
-    @staticmethod
-    def extract_action_items(transcript_text: str) -> List[Dict[str, str]]:
-        """
-        Extract action items from transcript
-        
-        Args:
-            transcript_text: Full meeting transcript
-            
-        Returns:
-            List of action items with task, owner, due_date, priority
-        """
-        try:
-            prompt = f"""
+
+_ACTIONS_PROMPT_PREFIX = """
 Extract action items from this meeting transcript.
 For each action item, identify:
 - task: What needs to be done
@@ -95,39 +72,111 @@ For each action item, identify:
 
 Format as JSON array:
 [
-    {{
+    {
         "task": "Complete Jira integration API design",
         "owner": "Alex Kumar",
         "due_date": "2026-01-12",
         "priority": "high"
-    }}
+    }
 ]
 
 Transcript:
-{transcript_text}
+"""
+_ACTIONS_PROMPT_SUFFIX = """
 
 Respond ONLY with valid JSON array, no additional text.
 If no action items found, return empty array [].
 """
-            
-            response = model.generate_content(prompt)
-            result_text = response.text.strip()
-            
-            # Remove markdown code blocks if present
-            if result_text.startswith("```json"):
-                result_text = result_text[7:]
-            if result_text.startswith("```"):
-                result_text = result_text[3:]
-            if result_text.endswith("```"):
-                result_text = result_text[:-3]
-            
-            result = json.loads(result_text.strip())
-            logger.info(f"Extracted {len(result)} action items")
+
+_EMOTIONS_PROMPT_PREFIX = """
+Analyze the emotional tone of this meeting transcript.
+For key moments, identify:
+- timestamp: Time in format "MM:SS"
+- emotion: happy, neutral, concerned, or frustrated
+- intensity: 0.0 to 1.0
+
+Format as JSON array (max 5 key moments):
+[
+    {
+        "timestamp": "00:00",
+        "emotion": "neutral",
+        "intensity": 0.5
+    }
+]
+
+Transcript:
+"""
+_EMOTIONS_PROMPT_SUFFIX = """
+
+Respond ONLY with valid JSON array, no additional text.
+"""
+
+_ANALYZE_ALL_PROMPT_PREFIX = """
+Analyze this meeting transcript and provide:
+1. A concise summary (2-3 sentences)
+2. Key discussion points (as a bullet list)
+3. Important decisions made (as a bullet list)
+4. Action items, each with:
+   - task: What needs to be done
+   - owner: Who is responsible (extract from transcript)
+   - due_date: When it's due (extract or estimate as YYYY-MM-DD)
+   - priority: high, medium, or low
+5. The emotional tone at key moments (max 5), each with:
+   - timestamp: Time in format "MM:SS"
+   - emotion: happy, neutral, concerned, or frustrated
+   - intensity: 0.0 to 1.0
+
+Format your response as JSON:
+{
+    "summary": "Brief summary here",
+    "key_points": ["Point 1", "Point 2", "Point 3"],
+    "decisions": ["Decision 1", "Decision 2"],
+    "action_items": [
+        {
+            "task": "Complete Jira integration API design",
+            "owner": "Alex Kumar",
+            "due_date": "2026-01-12",
+            "priority": "high"
+        }
+    ],
+    "emotions": [
+        {
+            "timestamp": "00:00",
+            "emotion": "neutral",
+            "intensity": 0.5
+        }
+    ]
+}
+
+Transcript:
+"""
+_ANALYZE_ALL_PROMPT_SUFFIX = """
+
+Respond ONLY with valid JSON, no additional text.
+If no action items found, use an empty array [] for action_items.
+"""
+
+
+class AIService:
+    """AI service for processing meeting transcripts"""
+    
+    @staticmethod
+    def _parse_response(result_text: str) -> Any:
+        """
+        Parse the JSON body of a Gemini response
+        
+        Strips markdown code fences; if the model added prose around the
+        JSON, decodes the first object or array found in the text.
+        """
+        stripped = _FENCE.sub("", result_text.strip())
+        try:
+            return orjson.loads(stripped)
+        except orjson.JSONDecodeError:
+            starts = [i for i in (stripped.find("{"), stripped.find("[")) if i != -1]
+            if not starts:
+                raise
+            result, _ = _JSON_DECODER.raw_decode(stripped, min(starts))
             return result
-            
-        except Exception as e:
-            logger.error(f"Failed to extract action items: {str(e)}")
-            return []
     
     @staticmethod
     def detect_participants(transcript_segments: List[Dict[str, str]]) -> List[str]:
@@ -138,15 +187,13 @@ If no action items found, return empty array [].
             transcript_segments: List of transcript segments with speaker field
             
         Returns:
-            List of unique participant names
+            List of unique participant names, in order of first appearance
         """
         try:
-            participants = set()
-            for segment in transcript_segments:
-                if 'speaker' in segment and segment['speaker']:
-                    participants.add(segment['speaker'])
-            
-            result = list(participants)
+            # dict keys dedupe while keeping first-seen speaker order
+            result = list(dict.fromkeys(
+                segment['speaker'] for segment in transcript_segments if segment.get('speaker')
+            ))
             logger.info(f"Detected {len(result)} participants")
             return result
             
@@ -155,51 +202,76 @@ If no action items found, return empty array [].
             return []
     
     @staticmethod
-    def analyze_emotions(transcript_text: str) -> List[Dict[str, Any]]:
+    def _cache_key(method: str, transcript_text: str) -> str:
+        """Cache key for an analysis of a transcript"""
+        return f"{method}:{hashlib.sha256(transcript_text.encode()).hexdigest()}"
+    
+    @staticmethod
+    async def agenerate_summary(transcript_text: str) -> Dict[str, Any]:
         """
-        Analyze emotions from transcript
+        Generate meeting summary from transcript
         
         Args:
             transcript_text: Full meeting transcript
             
         Returns:
-            List of emotion data points
+            Dict with summary, key_points, and decisions
         """
         try:
-            prompt = f"""
-Analyze the emotional tone of this meeting transcript.
-For key moments, identify:
-- timestamp: Time in format "MM:SS"
-- emotion: happy, neutral, concerned, or frustrated
-- intensity: 0.0 to 1.0
-
-Format as JSON array (max 5 key moments):
-[
-    {{
-        "timestamp": "00:00",
-        "emotion": "neutral",
-        "intensity": 0.5
-    }}
-]
-
-Transcript:
-{transcript_text}
-
-Respond ONLY with valid JSON array, no additional text.
-"""
+            response = await model.generate_content_async(
+                _SUMMARY_PROMPT_PREFIX + transcript_text + _SUMMARY_PROMPT_SUFFIX
+            )
+            result = AIService._parse_response(response.text)
+            logger.info("Summary generated successfully")
+            return result
             
-            response = model.generate_content(prompt)
-            result_text = response.text.strip()
+        except Exception as e:
+            logger.error(f"Failed to generate summary: {str(e)}")
+            return {
+                "summary": "Failed to generate summary",
+                "key_points": [],
+                "decisions": []
+            }
+    
+    @staticmethod
+    async def aextract_action_items(transcript_text: str) -> List[Dict[str, str]]:
+        """
+        Extract action items from transcript
+        
+        Args:
+            transcript_text: Full meeting transcript
             
-            # Remove markdown code blocks if present
-            if result_text.startswith("```json"):
-                result_text = result_text[7:]
-            if result_text.startswith("```"):
-                result_text = result_text[3:]
-            if result_text.endswith("```"):
-                result_text = result_text[:-3]
+        Returns:
+            List of action items with task, owner, due_date, priority
+        """
+        try:
+            response = await model.generate_content_async(
+                _ACTIONS_PROMPT_PREFIX + transcript_text + _ACTIONS_PROMPT_SUFFIX
+            )
+            result = AIService._parse_response(response.text)
+            logger.info(f"Extracted {len(result)} action items")
+            return result
             
-            result = json.loads(result_text.strip())
+        except Exception as e:
+            logger.error(f"Failed to extract action items: {str(e)}")
+            return []
+    
+    @staticmethod
+    async def aanalyze_emotions(transcript_text: str) -> List[Dict[str, Any]]:
+        """
+        Analyze emotions from transcript
+        
+        Args:
+            transcript_text: Full meeting transcript
+            
+        Returns:
+            List of emotion data points
+        """
+        try:
+            response = await model.generate_content_async(
+                _EMOTIONS_PROMPT_PREFIX + transcript_text + _EMOTIONS_PROMPT_SUFFIX
+            )
+            result = AIService._parse_response(response.text)
             logger.info(f"Analyzed {len(result)} emotion points")
             return result
             
@@ -207,6 +279,55 @@ Respond ONLY with valid JSON array, no additional text.
             logger.error(f"Failed to analyze emotions: {str(e)}")
             return []
     
+    @staticmethod
+    async def _aanalyze_all(transcript_text: str) -> Dict[str, Any]:
+        """Single combined LLM call; raises if the response can't be used"""
+        response = await model.generate_content_async(
+            _ANALYZE_ALL_PROMPT_PREFIX + transcript_text + _ANALYZE_ALL_PROMPT_SUFFIX
+        )
+        result = AIService._parse_response(response.text)
+        logger.info(
+            f"Analyzed transcript: {len(result.get('action_items', []))} action items, "
+            f"{len(result.get('emotions', []))} emotion points"
+        )
+        return result
+    
+    @staticmethod
+    async def aanalyze_all(transcript_text: str, use_cache: bool = True) -> Dict[str, Any]:
+        """
+        Run summary, action item and emotion analysis in a single LLM call
+        
+        The transcript is sent once instead of once per analysis, which cuts
+        input tokens and round-trips to a third of the separate methods.
+        If the combined call fails, the separate analyses are run
+        concurrently so latency is the slowest call rather than their sum.
+        
+        Args:
+            transcript_text: Full meeting transcript
+            use_cache: Reuse a cached result for the same transcript
+            
+        Returns:
+            Dict with summary, key_points, decisions, action_items and emotions
+        """
+        key = AIService._cache_key("analyze_all", transcript_text)
+        if use_cache:
+            cached = analysis_cache.get(key)
+            if cached is not None:
+                return orjson.loads(cached)
+        
+        try:
+            result = await AIService._aanalyze_all(transcript_text)
+            analysis_cache.set(key, orjson.dumps(result))
+            return result
+        except Exception as e:
+            logger.error(f"Combined analysis failed, using separate calls: {str(e)}")
+            summary, action_items, emotions = await asyncio.gather(
+                AIService.agenerate_summary(transcript_text),
+                AIService.aextract_action_items(transcript_text),
+                AIService.aanalyze_emotions(transcript_text)
+            )
+            return {**summary, "action_items": action_items, "emotions": emotions}
+    
     @staticmethod
     def calculate_overall_emotion_score(emotions: List[Dict[str, Any]]) -> float:
         """
@@ -221,26 +342,22 @@ Respond ONLY with valid JSON array, no additional text.
         if not emotions:
             return 7.0  # Default neutral-positive score
         
-        # Map emotions to scores
-        emotion_scores = {
-            "happy": 9.0,
-            "neutral": 7.0,
-            "concerned": 5.0,
-            "frustrated": 3.0
-        }
-        
-        total_score = 0
-        total_weight = 0
-        
-        for emotion in emotions:
-            base_score = emotion_scores.get(emotion.get("emotion", "neutral"), 7.0)
-            intensity = emotion.get("intensity", 0.5)
-            weight = intensity
-            
-            total_score += base_score * weight
-            total_weight += weight
+        scores = np.fromiter(
+            (EMOTION_SCORES.get(e.get("emotion", "neutral"), 7.0) for e in emotions),
+            dtype=np.float64,
+            count=len(emotions)
+        )
+        weights = np.fromiter(
+            (e.get("intensity", 0.5) for e in emotions),
+            dtype=np.float64,
+            count=len(emotions)
+        )
         
+        total_weight = weights.sum()
         if total_weight == 0:
             return 7.0
         
-        return round(total_score / total_weight, 1)
+        return round(float(scores @ weights / total_weight), 1)
+
+# Shared service instance used by all API modules
+ai_service = AIService()
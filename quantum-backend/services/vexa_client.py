@@ -3,13 +3,51 @@ Vexa AI Client for Meeting Bot Management and Transcription
 Handles all interactions with the Vexa AI API
 """
 
-import requests
+import asyncio
+import httpx
 from typing import Optional, Dict, Any, List
 from pydantic import BaseModel
+from services.cache import TTLCache
+from config import settings
 import logging
+import orjson
+import random
 
 logger = logging.getLogger(__name__)
 
+# Cache lifetimes (seconds) for polled read endpoints. Transcripts of
+# finished meetings no longer change, so they can be kept much longer.
+ACTIVE_TRANSCRIPT_TTL = 5
+FINISHED_TRANSCRIPT_TTL = 600
+MEETINGS_LIST_TTL = 5
+BOT_STATUS_TTL = 5
+# How long a validator (ETag) and its body are kept for conditional re-fetches
+ETAG_TTL = 3600
+FINISHED_MEETING_STATUSES = ("completed", "failed")
+
+# Transient failures (rate limits, gateway errors, dropped connections) are
+# retried with jittered exponential backoff: up to MAX_RETRIES extra attempts
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+MAX_RETRIES = 3
+RETRY_BACKOFF = 0.5  # seconds, doubled per attempt
+RETRY_MAX_DELAY = 10.0  # longest Retry-After worth waiting for; longer fails now
+
+# Request timeouts: fail fast on connect, and give each call a read budget
+# that matches how long Vexa normally takes to answer it
+DEFAULT_TIMEOUT = httpx.Timeout(10.0, connect=3.0)
+TRANSCRIPT_TIMEOUT = httpx.Timeout(5.0, connect=3.0)
+BOT_REQUEST_TIMEOUT = httpx.Timeout(30.0, connect=3.0)  # bot provisioning is slow
+
+
+class VexaAPIError(Exception):
+    """A Vexa API call failed after any retries"""
+    
+    def __init__(self, operation: str, cause: httpx.HTTPError):
+        self.operation = operation
+        # HTTP status of the failed response, None for transport errors
+        self.status_code = cause.response.status_code if isinstance(cause, httpx.HTTPStatusError) else None
+        super().__init__(f"Failed to {operation}: {cause}")
+
 
 class BotRequest(BaseModel):
     """Request model for creating a bot"""
@@ -23,37 +61,131 @@ class BotRequest(BaseModel):
 class VexaClient:
     """Client for interacting with Vexa AI API"""
     
-    def __init__(self, api_key: str, base_url: str = "https://api.cloud.vexa.ai"):
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str = "https://api.cloud.vexa.ai",
+        timeout: httpx.Timeout = DEFAULT_TIMEOUT
+    ):
         self.api_key = api_key
         self.base_url = base_url
+        # Fixed endpoints, built once instead of per call
+        self._bots_url = f"{base_url}/bots"
+        self._bot_status_url = f"{base_url}/bots/status"
+        self._meetings_url = f"{base_url}/meetings"
         self.headers = {
             "X-API-Key": api_key,
             "Content-Type": "application/json"
         }
+        # One pooled HTTP/2 client for all calls, so connections and TLS
+        # sessions are reused instead of re-established per request.
+        # httpx advertises Accept-Encoding for every decoder it has (gzip,
+        # deflate, and br via the brotli extra) and decompresses responses,
+        # so large transcript bodies travel compressed
+        self._client = httpx.AsyncClient(
+            headers=self.headers,
+            http2=True,
+            timeout=timeout,
+            limits=httpx.Limits(max_keepalive_connections=32)
+        )
+        self._transcript_cache = TTLCache(maxsize=256, ttl=ACTIVE_TRANSCRIPT_TTL)
+        self._meetings_cache = TTLCache(maxsize=1, ttl=MEETINGS_LIST_TTL)
+        self._bot_status_cache = TTLCache(maxsize=1, ttl=BOT_STATUS_TTL)
+        self._etag_cache = TTLCache(maxsize=256, ttl=ETAG_TTL)
+    
+    async def aclose(self) -> None:
+        """Close the underlying HTTP connection pool"""
+        await self._client.aclose()
+    
+    @staticmethod
+    def _api_error(operation: str, cause: httpx.HTTPError) -> VexaAPIError:
+        """Log a failed call and wrap it, keeping the original as __cause__"""
+        logger.error("Failed to %s: %s", operation, cause)
+        return VexaAPIError(operation, cause)
     
-    def request_bot(self, bot_request: BotRequest) -> Dict[str, Any]:
+    async def _request(self, method: str, url: str, retry: bool = True, **kwargs) -> httpx.Response:
+        """
+        Send a request and raise for error statuses
+        
+        With retry, transport errors and RETRY_STATUSES responses are retried
+        with jittered exponential backoff, honouring a numeric Retry-After
+        up to RETRY_MAX_DELAY; a longer Retry-After raises immediately.
+        """
+        attempts = MAX_RETRIES + 1 if retry else 1
+        for attempt in range(attempts):
+            last_attempt = attempt == attempts - 1
+            try:
+                response = await self._client.request(method, url, **kwargs)
+            except httpx.TransportError as e:
+                if last_attempt:
+                    raise
+                reason = type(e).__name__
+                delay = None
+            else:
+                if last_attempt or response.status_code not in RETRY_STATUSES:
+                    # 304 answers a conditional GET; the caller holds the body
+                    if response.status_code != httpx.codes.NOT_MODIFIED:
+                        response.raise_for_status()
+                    return response
+                reason = response.status_code
+                retry_after = response.headers.get("Retry-After", "")
+                delay = float(retry_after) if retry_after.isdigit() else None
+                if delay is not None and delay > RETRY_MAX_DELAY:
+                    # Don't hold the caller far past its own timeout
+                    response.raise_for_status()
+            
+            if delay is None:
+                # Full jitter, so clients sharing a quota don't retry in lockstep
+                delay = random.uniform(0, RETRY_BACKOFF * 2 ** attempt)
+            logger.warning(f"{method} {url} failed ({reason}), retrying in {delay:.2f}s")
+            await asyncio.sleep(delay)
+    
+    async def _get_json(self, url: str, **kwargs) -> Any:
+        """
+        GET and decode a JSON body, revalidating with If-None-Match
+        
+        When Vexa sent an ETag for this URL earlier, an unchanged resource
+        comes back as a bodyless 304 and the stored body is reused.
+        """
+        validated = self._etag_cache.get(url)
+        headers = {"If-None-Match": validated[0]} if validated else None
+        
+        response = await self._request("GET", url, headers=headers, **kwargs)
+        if response.status_code == httpx.codes.NOT_MODIFIED and validated:
+            return validated[1]
+        
+        result = orjson.loads(response.content)
+        etag = response.headers.get("ETag")
+        if etag:
+            self._etag_cache.set(url, (etag, result))
+        return result
+    
+    async def request_bot(self, bot_request: BotRequest, retry: bool = False) -> Dict[str, Any]:
         """
         Request a bot to join a meeting
         
         Args:
             bot_request: BotRequest object with meeting details
+            retry: Retry transient failures; off by default since a request
+                that reached Vexa before failing could create a second bot
             
         Returns:
             Dict with bot and meeting details
         """
-        url = f"{self.base_url}/bots"
+        url = self._bots_url
         payload = bot_request.model_dump(exclude_none=True)
         
         try:
-            response = requests.post(url, headers=self.headers, json=payload)
-            response.raise_for_status()
-            logger.info(f"Bot requested successfully for meeting {bot_request.native_meeting_id}")
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Failed to request bot: {str(e)}")
-            raise Exception(f"Failed to request bot: {str(e)}")
+            response = await self._request(
+                "POST", url, retry=retry, timeout=BOT_REQUEST_TIMEOUT, content=orjson.dumps(payload)
+            )
+            logger.debug(f"Bot requested successfully for meeting {bot_request.native_meeting_id}")
+            self._invalidate_listings()
+            return orjson.loads(response.content)
+        except httpx.HTTPError as e:
+            raise self._api_error("request bot", e) from e
     
-    def get_transcript(self, platform: str, native_meeting_id: str) -> Dict[str, Any]:
+    async def get_transcript(self, platform: str, native_meeting_id: str) -> Dict[str, Any]:
         """
         Get real-time transcript for a meeting
         
@@ -64,34 +196,56 @@ class VexaClient:
         Returns:
             Dict with transcript data
         """
+        cache_key = (platform, native_meeting_id)
+        cached = self._transcript_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
         url = f"{self.base_url}/transcripts/{platform}/{native_meeting_id}"
         
         try:
-            response = requests.get(url, headers=self.headers)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Failed to get transcript: {str(e)}")
-            raise Exception(f"Failed to get transcript: {str(e)}")
+            result = await self._get_json(url, timeout=TRANSCRIPT_TIMEOUT)
+        except httpx.HTTPError as e:
+            raise self._api_error("get transcript", e) from e
+        
+        ttl = None
+        if isinstance(result, dict) and result.get("status") in FINISHED_MEETING_STATUSES:
+            ttl = FINISHED_TRANSCRIPT_TTL
+        self._transcript_cache.set(cache_key, result, ttl=ttl)
+        return result
+    
+    def invalidate_transcript(self, platform: str, native_meeting_id: str) -> None:
+        """Drop a cached transcript so the next read goes to Vexa"""
+        self._transcript_cache.pop((platform, native_meeting_id))
     
-    def get_bot_status(self) -> List[Dict[str, Any]]:
+    def _invalidate_listings(self) -> None:
+        """Drop cached bot status and meeting list after a bot starts or stops"""
+        self._bot_status_cache.clear()
+        self._meetings_cache.clear()
+    
+    async def get_bot_status(self) -> List[Dict[str, Any]]:
         """
         Get status of all running bots
         
         Returns:
             List of active bots
         """
-        url = f"{self.base_url}/bots/status"
+        cached = self._bot_status_cache.get("bots")
+        if cached is not None:
+            return cached
+        
+        url = self._bot_status_url
         
         try:
-            response = requests.get(url, headers=self.headers)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Failed to get bot status: {str(e)}")
-            raise Exception(f"Failed to get bot status: {str(e)}")
-    
-    def update_bot_config(
+            response = await self._request("GET", url)
+            result = orjson.loads(response.content)
+        except httpx.HTTPError as e:
+            raise self._api_error("get bot status", e) from e
+        
+        self._bot_status_cache.set("bots", result)
+        return result
+    
+    async def update_bot_config(
         self, 
         platform: str, 
         native_meeting_id: str, 
@@ -112,15 +266,13 @@ class VexaClient:
         payload = {"language": language}
         
         try:
-            response = requests.put(url, headers=self.headers, json=payload)
-            response.raise_for_status()
-            logger.info(f"Bot config updated for meeting {native_meeting_id}")
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Failed to update bot config: {str(e)}")
-            raise Exception(f"Failed to update bot config: {str(e)}")
+            response = await self._request("PUT", url, content=orjson.dumps(payload))
+            logger.debug(f"Bot config updated for meeting {native_meeting_id}")
+            return orjson.loads(response.content)
+        except httpx.HTTPError as e:
+            raise self._api_error("update bot config", e) from e
     
-    def stop_bot(self, platform: str, native_meeting_id: str) -> Dict[str, Any]:
+    async def stop_bot(self, platform: str, native_meeting_id: str) -> Dict[str, Any]:
         """
         Stop a bot and remove it from the meeting
         IMPORTANT: Call this to free up API credits
@@ -135,32 +287,35 @@ class VexaClient:
         url = f"{self.base_url}/bots/{platform}/{native_meeting_id}"
         
         try:
-            response = requests.delete(url, headers=self.headers)
-            response.raise_for_status()
-            logger.info(f"Bot stopped for meeting {native_meeting_id}")
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Failed to stop bot: {str(e)}")
-            raise Exception(f"Failed to stop bot: {str(e)}")
+            response = await self._request("DELETE", url)
+            logger.debug(f"Bot stopped for meeting {native_meeting_id}")
+            self._invalidate_listings()
+            return orjson.loads(response.content)
+        except httpx.HTTPError as e:
+            raise self._api_error("stop bot", e) from e
     
-    def list_meetings(self) -> List[Dict[str, Any]]:
+    async def list_meetings(self) -> List[Dict[str, Any]]:
         """
         List all meetings associated with the API key
         
         Returns:
             List of meeting records
         """
-        url = f"{self.base_url}/meetings"
+        cached = self._meetings_cache.get("meetings")
+        if cached is not None:
+            return cached
+        
+        url = self._meetings_url
         
         try:
-            response = requests.get(url, headers=self.headers)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Failed to list meetings: {str(e)}")
-            raise Exception(f"Failed to list meetings: {str(e)}")
-    
-    def update_meeting_data(
+            result = await self._get_json(url)
+        except httpx.HTTPError as e:
+            raise self._api_error("list meetings", e) from e
+        
+        self._meetings_cache.set("meetings", result)
+        return result
+    
+    async def update_meeting_data(
         self,
         platform: str,
         native_meeting_id: str,
@@ -179,34 +334,25 @@ class VexaClient:
             participants: List of participant names
             languages: List of language codes
             notes: Meeting notes
+            (None leaves a field unchanged)
             
         Returns:
             Dict with updated meeting record
         """
         url = f"{self.base_url}/meetings/{platform}/{native_meeting_id}"
-        data = {}
-        
-        if name:
-            data["name"] = name
-        if participants:
-            data["participants"] = participants
-        if languages:
-            data["languages"] = languages
-        if notes:
-            data["notes"] = notes
-        
-        payload = {"data": data}
+        # Only fields that were passed; an empty string or list clears the field
+        fields = (("name", name), ("participants", participants), ("languages", languages), ("notes", notes))
+        payload = {"data": {key: value for key, value in fields if value is not None}}
         
         try:
-            response = requests.patch(url, headers=self.headers, json=payload)
-            response.raise_for_status()
-            logger.info(f"Meeting data updated for {native_meeting_id}")
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Failed to update meeting data: {str(e)}")
-            raise Exception(f"Failed to update meeting data: {str(e)}")
-    
-    def delete_meeting_transcripts(
+            response = await self._request("PATCH", url, content=orjson.dumps(payload))
+            logger.debug(f"Meeting data updated for {native_meeting_id}")
+            self._meetings_cache.clear()
+            return orjson.loads(response.content)
+        except httpx.HTTPError as e:
+            raise self._api_error("update meeting data", e) from e
+    
+    async def delete_meeting_transcripts(
         self, 
         platform: str, 
         native_meeting_id: str
@@ -225,10 +371,14 @@ class VexaClient:
         url = f"{self.base_url}/meetings/{platform}/{native_meeting_id}"
         
         try:
-            response = requests.delete(url, headers=self.headers)
-            response.raise_for_status()
-            logger.info(f"Meeting transcripts deleted for {native_meeting_id}")
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Failed to delete meeting transcripts: {str(e)}")
-            raise Exception(f"Failed to delete meeting transcripts: {str(e)}")
+            response = await self._request("DELETE", url)
+            logger.debug(f"Meeting transcripts deleted for {native_meeting_id}")
+            self._meetings_cache.clear()
+            self.invalidate_transcript(platform, native_meeting_id)
+            return orjson.loads(response.content)
+        except httpx.HTTPError as e:
+            raise self._api_error("delete meeting transcripts", e) from e
+
+
+# Shared client instance used by all API modules
+vexa_client = VexaClient(api_key=settings.vexa_api_key, base_url=settings.vexa_base_url)
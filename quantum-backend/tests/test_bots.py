@@ -0,0 +1,67 @@
+"""
+Tests for meeting URL parsing in the bots API
+"""
+
+import pytest
+
+from api.bots import extract_meeting_id, extract_passcode
+
+
+@pytest.mark.parametrize("meeting_url, expected", [
+    ("https://teams.live.com/meet/9366473044740?p=xxx", "xxx"),
+    ("https://teams.live.com/meet/9366473044740?foo=1&p=xxx", "xxx"),
+    ("https://teams.live.com/meet/9366473044740?p=xxx&foo=1", "xxx"),
+    ("https://teams.live.com/meet/9366473044740?p=xxx#frag", "xxx"),
+])
+def test_extract_passcode(meeting_url, expected):
+    assert extract_passcode(meeting_url) == expected
+
+
+@pytest.mark.parametrize("meeting_url", [
+    "https://teams.live.com/meet/9366473044740",
+    "https://teams.live.com/meet/9366473044740?foo=1",
+    "https://teams.live.com/meet/9366473044740?p=",
+    "https://teams.live.com/meet/9366473044740#p=xxx",
+])
+def test_extract_passcode_missing(meeting_url):
+    assert extract_passcode(meeting_url) is None
+
+
+@pytest.mark.parametrize("meeting_url", [
+    "https://teams.live.com/meet/9366473044740?np=xxx",
+    "https://teams.live.com/meet/9366473044740?foo=1&xp=xxx",
+])
+def test_extract_passcode_only_matches_whole_parameter(meeting_url):
+    assert extract_passcode(meeting_url) is None
+
+
+def test_extract_passcode_skips_lookalike_parameter():
+    meeting_url = "https://teams.live.com/meet/9366473044740?xp=no&p=yes"
+    assert extract_passcode(meeting_url) == "yes"
+
+
+@pytest.mark.parametrize("platform, meeting_url, expected", [
+    ("google_meet", "https://meet.google.com/abc-defg-hij", ("abc-defg-hij", None)),
+    ("google_meet", "meet.google.com/abc-defg-hij?authuser=0", ("abc-defg-hij", None)),
+    ("teams", "https://teams.live.com/meet/9366473044740?p=xxx", ("9366473044740", "xxx")),
+    ("teams", "https://teams.live.com/meet/9366473044740", ("9366473044740", None)),
+])
+def test_extract_meeting_id(platform, meeting_url, expected):
+    assert extract_meeting_id(platform, meeting_url) == expected
+
+
+@pytest.mark.parametrize("platform, meeting_url", [
+    ("google_meet", "https://evil.example/?next=meet.google.com/abc-defg-hij"),
+    ("google_meet", "https://evil.example/meet.google.com/abc-defg-hij"),
+    ("google_meet", "https://meet.google.com.evil.example/abc-defg-hij"),
+    ("teams", "https://evil.example/?next=teams.live.com/meet/9366473044740"),
+    ("teams", "https://teams.live.com/meet/"),
+])
+def test_extract_meeting_id_rejects_other_hosts(platform, meeting_url):
+    with pytest.raises(ValueError):
+        extract_meeting_id(platform, meeting_url)
+
+
+def test_extract_meeting_id_unsupported_platform():
+    with pytest.raises(ValueError):
+        extract_meeting_id("zoom", "https://zoom.us/j/123")